@@ -1,29 +1,37 @@
+import importlib
 import streamlit as st
-from scripts.prediction import show_prediction
-from scripts.about import show_about
-from scripts.metar import show_metar
-from scripts.taf import show_taf
-from scripts.cloud import show_cloud
-from scripts.solar import visualize_csv
-from scripts.location import show_location_predictions 
+from scripts import metrics
+
+# Page -> (module, function). A page's module (and its heavy imports) loads only when it is first selected.
+PAGES = {
+    "About": ("scripts.about", "show_about"),
+    "Prediction": ("scripts.prediction", "show_prediction"),
+    "METAR": ("scripts.metar", "show_metar"),
+    "TAF": ("scripts.taf", "show_taf"),
+    "Cloud Forecast": ("scripts.cloud", "show_cloud"),
+    "Solar Parameters": ("scripts.solar", "visualize_csv"),
+    "Location": ("scripts.location", "show_location_predictions"),
+}
+
+# Not listed in the navigation; opened with ?page=<name> in the URL
+HIDDEN_PAGES = {
+    "diagnostics": ("scripts.diagnostics", "show_diagnostics"),
+}
+
+def load_page(page):
+    module_name, function_name = PAGES.get(page) or HIDDEN_PAGES[page]
+    return getattr(importlib.import_module(module_name), function_name)
 
 st.set_page_config(layout="wide", page_title="🌤️ Energy Prediction Dashboard")
 
 # Sidebar Navigation
 st.sidebar.title("Navigation")
-page = st.sidebar.radio("Go to", ["About", "Prediction", "METAR", "TAF", "Cloud Forecast", "Solar Parameters", "Location"])
+page = st.sidebar.radio("Go to", list(PAGES))
+if st.query_params.get("page") in HIDDEN_PAGES:
+    page = st.query_params["page"]
 
-if page == "About":
-    show_about()
-elif page == "Prediction":
-    show_prediction()
-elif page == "METAR":
-    show_metar()
-elif page == "Cloud Forecast":
-    show_cloud()
-elif page == "TAF":
-    show_taf()
-elif page == "Solar Parameters":
-    visualize_csv("csv/solar_2025.csv")
-elif page == "Location":
-    show_location_predictions()
+with metrics.timed(f"page:{page}"):
+    if page == "Solar Parameters":
+        load_page(page)("csv/solar_2025.csv")
+    else:
+        load_page(page)()
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import os
+from scripts.table_cache import load_frame
 
 def show_about():
     st.title("About CIRRUS")
@@ -103,11 +104,14 @@ def show_about():
     csv_path = os.path.join("csv", "residuals.csv")
     
     if os.path.exists(csv_path):
-        df = pd.read_csv(csv_path)
+        # Typed, memory-mapped copy shared by every session (rebuilt when the CSV changes)
+        try:
+            df = load_frame(csv_path, 'Timestamp')
+        except (KeyError, ValueError):
+            df = pd.DataFrame()  # Not a timestamped numeric table
 
         # Ensure 'Timestamp' remains a column (not an index)
         if {'Timestamp', 'Actual Values', 'Predicted Values', 'Residuals'}.issubset(df.columns):
-            df['Timestamp'] = pd.to_datetime(df['Timestamp'])  # Convert Timestamp to datetime format
             df = df[['Timestamp', 'Actual Values', 'Predicted Values', 'Residuals']]  # Explicit column order
 
             # Sort data based on Timestamp to avoid incorrect order
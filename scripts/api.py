@@ -0,0 +1,183 @@
+import argparse
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+from scripts import metrics
+from scripts.model import load_model, predict_power_batch
+from scripts.scheduler import ensure_scheduler_started, load_latest_snapshot
+
+logger = logging.getLogger(__name__)
+
+class MicroBatcher:
+    """Collects concurrent prediction requests for a short window and scores them in one booster call."""
+
+    def __init__(self, window=0.005, max_rows=4096):
+        self.window = window
+        self.max_rows = max_rows
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, features_df):
+        """Queues features_df for scoring and blocks until its predictions are ready."""
+        future = Future()
+        self._queue.put((features_df, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            rows = len(batch[0][0])
+            deadline = time.monotonic() + self.window
+            while rows < self.max_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            self._score(batch)
+
+    def _score(self, batch):
+        try:
+            model, expected_features = load_model()
+            frames = [features_df[expected_features] for features_df, _ in batch]
+            predictions = predict_power_batch(model, expected_features, pd.concat(frames, ignore_index=True))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        # Hand every request back its own slice of the batch
+        bounds = np.cumsum([0] + [len(frame) for frame in frames])
+        for (_, future), start, end in zip(batch, bounds[:-1], bounds[1:]):
+            future.set_result(predictions[start:end])
+
+def latest_forecast():
+    """Returns the newest forecast snapshot as a DataFrame without recomputing it.
+
+    Only when no snapshot exists yet is one computed synchronously.
+    """
+    scheduler = ensure_scheduler_started()
+    snapshot = load_latest_snapshot()
+    if snapshot is None:
+        scheduler.refresh()
+        snapshot = load_latest_snapshot()
+    return snapshot[0] if snapshot is not None else pd.DataFrame()
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    batcher = None  # Set by serve()
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_text(self, status, text, content_type="text/plain; version=0.0.4"):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/metrics":
+            # Prometheus text format: stage durations, cache hits/misses, upstream status codes and bytes
+            self._send_text(200, metrics.prometheus_text())
+        elif self.path == "/metrics.json":
+            self._send_json(200, metrics.snapshot())
+        elif self.path == "/forecast":
+            try:
+                df = latest_forecast()
+            except Exception as e:
+                logger.exception("Forecast refresh failed")
+                self._send_json(503, {"error": f"Forecast unavailable: {e}"})
+                return
+            if df.empty:
+                self._send_json(503, {"error": "No weather data available for predictions."})
+            else:
+                self._send_json(200, {"forecast": json.loads(df.to_json(orient="records"))})
+        else:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            rows = payload["rows"] if isinstance(payload, dict) and "rows" in payload else payload
+            features_df = pd.DataFrame(rows if isinstance(rows, list) else [rows])
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {"error": f"Invalid JSON body: {e}"})
+            return
+
+        try:
+            _, expected_features = load_model()
+        except Exception as e:
+            logger.exception("Model load failed")
+            self._send_json(500, {"error": f"Model unavailable: {e}"})
+            return
+        missing = [name for name in expected_features if name not in features_df.columns]
+        if missing or features_df.empty:
+            self._send_json(400, {"error": "Missing features", "missing": missing})
+            return
+
+        # Validate per request so one bad payload cannot fail the whole batch
+        try:
+            features_df = features_df[expected_features].apply(pd.to_numeric).astype(float)
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {"error": f"Non-numeric feature value: {e}"})
+            return
+
+        try:
+            predictions = self.batcher.submit(features_df)
+        except Exception as e:
+            logger.exception("Batched prediction failed")
+            self._send_json(500, {"error": str(e)})
+            return
+        self._send_json(200, {"predictions": [round(float(p), 2) for p in predictions]})
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+class PredictionServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # Room for bursts of concurrent clients (the default backlog is 5)
+
+def serve(host="127.0.0.1", port=8080, window=0.005):
+    PredictionHandler.batcher = MicroBatcher(window=window)
+    server = PredictionServer((host, port), PredictionHandler)
+    logger.info(f"Serving /predict, /forecast and /metrics on http://{host}:{port}")
+    server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve solar power predictions over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--batch-window-ms", type=float, default=5.0,
+                        help="How long to collect concurrent /predict requests before scoring them together")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    serve(args.host, args.port, args.batch_window_ms / 1000.0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+import argparse
+import glob
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from scripts.model import load_model, predict_power_batch
+from scripts.sources import prepare_hrrr_frame
+from scripts.solar_table import SOLAR_COLUMNS
+from scripts.weather import (CLOUD_COVER, HRRR_FEATURES, align_hrrr, apply_taf_groups,
+                             get_solar_params_batch, observed_features)
+from scripts.writers import ResultWriter
+
+logger = logging.getLogger(__name__)
+
+TIMEZONE = "America/Halifax"
+ARCHIVE_SUFFIXES = (".csv", ".parquet")
+
+# Time column (UTC) and the columns read from each archive.
+# METAR: the ASOS CSV export of the Iowa Environmental Mesonet (F, knots, miles, inHg).
+# HRRR: SpotWX CSVs as returned by the live feed, one file per run.
+# TAF: flattened forecast groups with the columns of weather.taf_groups_frame (times as ISO UTC).
+METAR_TIME, METAR_COLUMNS = "valid", ["tmpf", "relh", "sknt", "gust", "drct", "vsby", "alti", "skyc1", "skyc2", "skyc3"]
+HRRR_TIME, HRRR_COLUMNS = "DATETIME", [column for column, _ in HRRR_FEATURES.values()]
+TAF_TIME, TAF_COLUMNS = "valid_from", ["valid_to", "wind_speed_kmph", "wind_gust_kmph", "wind_direction_degrees",
+                                       "visibility_meters_float", "low_cloud_coverage", "mid_cloud_coverage",
+                                       "high_cloud_coverage"]
+
+# An observation counts for an hour only if it was taken this close to it
+METAR_TOLERANCE = pd.Timedelta(minutes=30)
+HRRR_TOLERANCE = pd.Timedelta(hours=1)
+
+def _read_archive_file(path, columns):
+    """Reads only the wanted columns of one archived CSV or Parquet file."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq  # Optional dependency, only needed for Parquet archives
+        available = pq.read_schema(path).names
+        return pd.read_parquet(path, columns=[c for c in columns if c in available])
+    return pd.read_csv(path, usecols=lambda c: c in columns, na_values=["M", "T"], low_memory=False)
+
+def index_archive(directory, time_column):
+    """Lists the archive files of a directory with the UTC time range each one covers.
+
+    Only the time column is read, so later chunks open just the files they overlap.
+    """
+    index = []
+    if not directory:
+        return index
+    for path in sorted(glob.glob(os.path.join(directory, "**", "*"), recursive=True)):
+        if not path.endswith(ARCHIVE_SUFFIXES):
+            continue
+        times = pd.to_datetime(_read_archive_file(path, [time_column])[time_column], utc=True, errors="coerce")
+        if times.notna().any():
+            index.append((path, times.min(), times.max()))
+    return index
+
+def _load_window(index, time_column, columns, start, end):
+    """Concatenates the archived rows with start <= time < end, from overlapping files only."""
+    frames = []
+    for path, first, last in index:
+        if last < start or first >= end:
+            continue
+        df = _read_archive_file(path, [time_column] + columns)
+        df[time_column] = pd.to_datetime(df[time_column], utc=True, errors="coerce")
+        frames.append(df[(df[time_column] >= start) & (df[time_column] < end)])
+    if not frames:
+        return pd.DataFrame({time_column: pd.Series(dtype="datetime64[ns, UTC]"),
+                             **{column: pd.Series(dtype="float64") for column in columns}})
+    return pd.concat(frames, ignore_index=True)
+
+def metar_features(metar, times):
+    """Converts archived METAR rows to model features at the nearest observation to each hour.
+
+    Hours without an observation within METAR_TOLERANCE are NaN.
+    """
+    features = list(observed_features({}))
+    if metar.empty:
+        return pd.DataFrame(np.nan, index=range(len(times)), columns=features)
+
+    metar = metar.dropna(subset=[METAR_TIME]).sort_values(METAR_TIME, kind="stable")
+    obs = pd.DataFrame({METAR_TIME: metar[METAR_TIME].to_numpy()})
+    obs['temperature_celsius'] = (pd.to_numeric(metar['tmpf'], errors='coerce').to_numpy() - 32) * 5 / 9
+    obs['humidity_percent'] = pd.to_numeric(metar['relh'], errors='coerce').round().to_numpy()
+    obs['wind_speed_kmph'] = pd.to_numeric(metar['sknt'], errors='coerce').to_numpy() * 1.852
+    obs['wind_gust_kmph'] = pd.to_numeric(metar['gust'], errors='coerce').fillna(0).to_numpy() * 1.852  # No gust reported
+    obs['wind_direction_degrees'] = pd.to_numeric(metar['drct'], errors='coerce').to_numpy()
+    obs['visibility_meters_float'] = pd.to_numeric(metar['vsby'], errors='coerce').to_numpy() * 1609.34
+    obs['altimeter_hpa'] = pd.to_numeric(metar['alti'], errors='coerce').to_numpy() * 33.8639
+    for layer, column in zip(("low", "mid", "high"), ("skyc1", "skyc2", "skyc3")):
+        codes = metar[column].astype("string").str.strip().fillna("").to_numpy()
+        obs[f'{layer}_cloud_coverage'] = [CLOUD_COVER.get(code, 0.0) for code in codes]
+
+    hours = pd.DataFrame({METAR_TIME: pd.DatetimeIndex(times).tz_convert("UTC")})
+    joined = pd.merge_asof(hours, obs, on=METAR_TIME, direction="nearest", tolerance=METAR_TOLERANCE)
+    return joined[features].astype(float)
+
+def build_features(times, metar, taf, hrrr):
+    """Builds the 16 model features for every hour in times from archived feeds.
+
+    Layers, from weakest to strongest: the nearest HRRR step, the TAF group valid at the
+    hour, then the METAR observed at the hour. Gaps carry forward from the hour before,
+    then fall back to the same defaults as a missing live METAR.
+    """
+    defaults = observed_features({})
+    frame = pd.DataFrame(np.nan, index=range(len(times)), columns=list(defaults))
+
+    aligned = align_hrrr(hrrr, times, HRRR_COLUMNS, tolerance=HRRR_TOLERANCE)
+    for feature, (column, scale) in HRRR_FEATURES.items():
+        frame[feature] = aligned[column].to_numpy() * scale
+
+    apply_taf_groups(frame, times, taf)
+
+    observed = metar_features(metar, times)
+    frame = observed.combine_first(frame)[list(defaults)]
+    frame = frame.ffill().fillna(defaults)
+
+    solar = get_solar_params_batch(times)
+    frame[SOLAR_COLUMNS[:-1]] = solar[SOLAR_COLUMNS[:-1]].to_numpy()
+    frame['timehr'] = pd.DatetimeIndex(times).hour
+    frame['tmaxGHI'] = solar['tmaxGHI'].to_numpy()
+    return frame
+
+def score_chunk(start, end, indexes):
+    """Builds and scores the features for the local hours start <= t < end (one worker task)."""
+    times = pd.date_range(start, end, freq="h", inclusive="left")
+    if times.empty:
+        return pd.DataFrame()
+    window = (times[0].tz_convert("UTC") - pd.Timedelta(hours=2), times[-1].tz_convert("UTC") + pd.Timedelta(hours=2))
+
+    metar = _load_window(indexes["metar"], METAR_TIME, METAR_COLUMNS, *window)
+    hrrr = _load_window(indexes["hrrr"], HRRR_TIME, HRRR_COLUMNS, *window)
+    # Later files are later runs: keep their value for a valid time also found in an earlier run
+    hrrr = hrrr.drop_duplicates(subset=[HRRR_TIME], keep="last")
+    hrrr[HRRR_TIME] = hrrr[HRRR_TIME].dt.tz_localize(None)  # prepare_hrrr_frame expects naive UTC
+    hrrr = prepare_hrrr_frame(hrrr)
+
+    # A TAF group may start long before the window, so look back a full day for them
+    taf = _load_window(indexes["taf"], TAF_TIME, TAF_COLUMNS, window[0] - pd.Timedelta(days=1), window[1])
+    if not taf.empty:
+        taf["valid_to"] = pd.to_datetime(taf["valid_to"], utc=True, errors="coerce")
+        taf = taf.dropna(subset=[TAF_TIME, "valid_to"])
+        taf = taf.assign(valid_from=taf[TAF_TIME].astype("int64"), valid_to=taf["valid_to"].astype("int64"))
+        taf = taf.astype(float).sort_values("valid_from", kind="stable", ignore_index=True)
+
+    features_df = build_features(times, metar, taf, hrrr)
+    model, expected_features = load_model()
+    predictions = predict_power_batch(model, expected_features, features_df)
+
+    result = pd.DataFrame({
+        'Timestamp': times.strftime("%Y-%m-%d %H:%M"),
+        'Predicted Values': predictions.astype(float),
+    })
+    return pd.concat([result, features_df], axis=1)
+
+def load_actuals(path):
+    """Reads measured power (Timestamp, Actual Values) keyed by the 'YYYY-MM-DD HH:MM' local hour."""
+    actuals = pd.read_csv(path, usecols=["Timestamp", "Actual Values"], dtype={"Actual Values": "float64"})
+    actuals["Timestamp"] = pd.to_datetime(actuals["Timestamp"]).dt.strftime("%Y-%m-%d %H:%M")
+    return actuals.drop_duplicates("Timestamp", keep="last").set_index("Timestamp")["Actual Values"]
+
+def run_backfill(start, end, out, metar_dir=None, hrrr_dir=None, taf_dir=None, actuals=None,
+                 chunk_days=7, workers=None):
+    """Scores every local hour in [start, end) from archived feeds and streams the rows to out.
+
+    The range is split into chunk_days chunks scored in parallel by a process pool; at most
+    two chunks per worker are in flight, so memory stays bounded however long the range is.
+    With actuals, rows have the csv/residuals.csv layout (Actual/Predicted Values, Residuals).
+    Returns the number of rows written.
+    """
+    indexes = {
+        "metar": index_archive(metar_dir, METAR_TIME),
+        "hrrr": index_archive(hrrr_dir, HRRR_TIME),
+        "taf": index_archive(taf_dir, TAF_TIME),
+    }
+    actual_values = load_actuals(actuals) if actuals else None
+
+    start = pd.Timestamp(start).tz_localize(TIMEZONE) if pd.Timestamp(start).tz is None else pd.Timestamp(start)
+    end = pd.Timestamp(end).tz_localize(TIMEZONE) if pd.Timestamp(end).tz is None else pd.Timestamp(end)
+    bounds = list(pd.date_range(start, end, freq=f"{chunk_days}D"))
+    if bounds[-1] < end:
+        bounds.append(end)
+    chunks = list(zip(bounds[:-1], bounds[1:]))
+
+    workers = workers or os.cpu_count() or 1
+    writer = ResultWriter(out)
+    rows = 0
+
+    def write_chunk(df):
+        nonlocal rows
+        if df.empty:
+            return
+        if actual_values is not None:
+            df = pd.DataFrame({
+                'Timestamp': df['Timestamp'],
+                'Actual Values': df['Timestamp'].map(actual_values),
+                'Predicted Values': df['Predicted Values'],
+            }).dropna(subset=['Actual Values'])
+            df['Residuals'] = df['Actual Values'] - df['Predicted Values']
+        writer.write(df)
+        rows += len(df)
+        logger.info(f"Wrote {rows} rows")
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = []
+            for chunk in chunks:
+                pending.append(pool.submit(score_chunk, *chunk, indexes))
+                if len(pending) >= 2 * workers:
+                    write_chunk(pending.pop(0).result())  # Chronological order
+            for future in pending:
+                write_chunk(future.result())
+    finally:
+        writer.close()
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill predictions over archived METAR/TAF/HRRR data.")
+    parser.add_argument("--start", required=True, help="First local hour, e.g. 2024-12-01")
+    parser.add_argument("--end", required=True, help="End of the range (exclusive), e.g. 2025-03-01")
+    parser.add_argument("--metar-dir", help="Directory of archived METAR CSV/Parquet files (IEM ASOS format)")
+    parser.add_argument("--hrrr-dir", help="Directory of archived SpotWX HRRR CSV/Parquet files")
+    parser.add_argument("--taf-dir", help="Directory of flattened TAF group CSV/Parquet files")
+    parser.add_argument("--actuals", help="CSV with Timestamp and Actual Values to compute residuals")
+    parser.add_argument("--out", required=True, help="Output .csv or .parquet file")
+    parser.add_argument("--chunk-days", type=int, default=7)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+    if not (args.metar_dir or args.hrrr_dir or args.taf_dir):
+        parser.error("give at least one of --metar-dir, --hrrr-dir or --taf-dir")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    rows = run_backfill(args.start, args.end, args.out, args.metar_dir, args.hrrr_dir, args.taf_dir,
+                        args.actuals, args.chunk_days, args.workers)
+    logger.info(f"Backfill finished: {rows} rows in {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
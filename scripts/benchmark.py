@@ -0,0 +1,272 @@
+import argparse
+import contextlib
+import http.server
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+# Recorded METAR/TAF/HRRR responses, replayed by a local stub server
+FIXTURE_DIR = os.path.join("benchmarks", "fixtures")
+# The fixtures were recorded at this time; pinning "now" to it keeps every run identical
+FIXTURE_TIME = pd.Timestamp("2025-06-21 09:00", tz="America/Halifax")
+
+ROW_SCALES = (1, 10, 100, 1_000, 10_000)
+SITE_SCALES = (1, 10, 100)
+# Solar page time ranges, as (label, hours)
+RANGE_SCALES = (("day", 24), ("week", 24 * 7), ("month", 24 * 30), ("quarter", 24 * 91), ("year", 24 * 365))
+
+# Every case runs at least MIN_CALLS times and until TIME_BUDGET seconds have passed (up to --repeat calls)
+MIN_CALLS = 3
+TIME_BUDGET = 0.5
+
+# A case regresses when its p50 or peak memory exceeds the baseline by more than the tolerance
+# and by more than these absolute floors (timer and allocator noise on tiny cases); a slower
+# p50 must also lie beyond the baseline's own p95, i.e. outside its run-to-run spread
+DEFAULT_TOLERANCE = 0.25
+LATENCY_FLOOR_MS = 0.05
+MEMORY_FLOOR_KIB = 64
+
+class _FixtureHandler(http.server.BaseHTTPRequestHandler):
+    """Serves metar.json, taf.json or hrrr.csv from the fixture directory by path prefix."""
+
+    routes = {"/metar": ("metar.json", "application/json"), "/taf": ("taf.json", "application/json"),
+              "/hrrr": ("hrrr.csv", "text/csv")}
+
+    def do_GET(self):
+        for prefix, (name, content_type) in self.routes.items():
+            if self.path.startswith(prefix):
+                with open(os.path.join(self.server.fixture_dir, name), "rb") as f:
+                    body = f.read()
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+        self.send_error(404)
+
+    def log_message(self, *args):
+        pass
+
+@contextlib.contextmanager
+def serve_fixtures(fixture_dir=FIXTURE_DIR):
+    """Runs the fixture stub on a free local port and points the feed settings at it."""
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _FixtureHandler)
+    server.fixture_dir = fixture_dir
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    settings = {"BASE_URL": f"{base}/metar", "LOCATION": "CYYG", "TOKEN": "benchmark",
+                "TAF_URL": f"{base}/taf", "LOC": "CYYG", "KEY": "benchmark",
+                "HRRR_URL": f"{base}/hrrr", "API_KEY": "benchmark"}
+    previous = {name: os.environ.get(name) for name in settings}
+    os.environ.update(settings)
+    try:
+        yield base
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        server.shutdown()
+        server.server_close()
+
+def measure(fn, rows=1, repeat=200):
+    """Times fn() and records the peak memory of one traced call.
+
+    Returns latency percentiles (ms), throughput (rows per second at the median latency)
+    and the peak traced allocation (KiB).
+    """
+    fn()  # Warm-up: imports, caches and lazily built structures are not part of the timing
+    samples = []
+    start = time.perf_counter()
+    while len(samples) < MIN_CALLS or (len(samples) < repeat and time.perf_counter() - start < TIME_BUDGET):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000
+    return {
+        "rows": rows,
+        "calls": len(samples),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "rows_per_s": float(rows / (p50 / 1000)) if p50 > 0 else float("inf"),
+        "peak_kib": peak / 1024,
+    }
+
+def hourly_times(n, start=FIXTURE_TIME):
+    return pd.date_range(start, periods=n, freq="h")
+
+def benchmark_cases():
+    """Yields (name, rows, fn) for every hot path at every scale."""
+    from scripts import model as model_module
+    from scripts.cache import source_cache
+    from scripts.downsample import get_multi_resolution
+    from scripts.forecast import DEFAULT_HORIZON, MAX_HORIZON
+    from scripts.sites import capacity_table, scale_to_sites, score_site
+    from scripts.solar_table import get_solar_table
+    from scripts.sources import fetch_sources_concurrently
+    from scripts.weather import align_hrrr, extract_weather_features_frame, get_solar_params_batch
+
+    def load_model_cold():
+        # Forget the loaded booster so the next call unpickles model.pkl again
+        model_module._registry = {"signature": None, "model": None, "expected_features": None}
+        model_module.load_model()
+
+    yield "load_model (cold)", 1, load_model_cold
+    yield "load_model (warm)", 1, model_module.load_model
+
+    def fetch_and_extract():
+        source_cache.invalidate()  # Every call goes to the (stub) feeds
+        extract_weather_features_frame(DEFAULT_HORIZON, on_source_error=lambda *args: None, current_time=FIXTURE_TIME)
+
+    yield f"fetch + extract_weather_features_frame[{DEFAULT_HORIZON}h]", DEFAULT_HORIZON, fetch_and_extract
+
+    sources = fetch_sources_concurrently()
+    for horizon in (DEFAULT_HORIZON, MAX_HORIZON):
+        yield f"extract_weather_features_frame[{horizon}h]", horizon, \
+            lambda horizon=horizon: extract_weather_features_frame(horizon, sources=sources, current_time=FIXTURE_TIME)
+
+    model, expected_features = model_module.load_model()
+    cloud_data = sources[2]
+    for n in ROW_SCALES:
+        times = hourly_times(n)
+        yield f"get_solar_params_batch[{n}]", n, lambda times=times: get_solar_params_batch(times)
+        yield f"align_hrrr[{n}]", n, lambda times=times: align_hrrr(cloud_data, times, ["TMP", "RH", "LCDC"])
+
+        features = extract_weather_features_frame(MAX_HORIZON, sources=sources, current_time=FIXTURE_TIME)
+        features = features.iloc[np.arange(n) % len(features)].reset_index(drop=True)
+        yield f"predict_power_batch[{n}]", n, \
+            lambda features=features: model_module.predict_power_batch(model, expected_features, features)
+
+    # The Solar Parameters page: filter one time range of the shared table down to plottable points
+    table = get_solar_table()
+    store = get_multi_resolution(table, table.frame)
+    start = pd.Timestamp("2025-01-01")
+    for label, hours in RANGE_SCALES:
+        end = start + pd.Timedelta(hours=hours)
+        yield f"visualize_csv series[{label}]", hours, \
+            lambda end=end: store.series(start, end, ["tmaxGHI", "solar_elevationdegrees"])
+
+    power = np.linspace(0, 9000, 1_000)
+    timestamps = hourly_times(len(power)).tz_localize(None)
+    for n in SITE_SCALES:
+        sites = {f"Site {i}": (46.0 + i * 0.01, -63.5 - i * 0.01, 1000.0) for i in range(n)}
+        capacities = capacity_table(sites)
+        yield f"scale_to_sites[{n} sites x {len(power)} rows]", n * len(power), \
+            lambda capacities=capacities: scale_to_sites(power, capacities, timestamps)
+
+        site_sources = (sources[0], sources[1], cloud_data, {})
+        yield f"score_site[{n} sites x {MAX_HORIZON}h]", n * MAX_HORIZON, \
+            lambda sites=sites: [score_site(name, site, site_sources, FIXTURE_TIME, MAX_HORIZON, {"forecast": {}})
+                                 for name, site in sites.items()]
+
+def run_benchmarks(name_filter=None, repeat=200, fixture_dir=FIXTURE_DIR):
+    """Runs every case (optionally only names containing name_filter) against the fixture stub."""
+    results = {}
+    with serve_fixtures(fixture_dir):
+        for name, rows, fn in benchmark_cases():
+            if name_filter and name_filter not in name:
+                continue
+            results[name] = measure(fn, rows, repeat)
+            print(format_row(name, results[name]), flush=True)
+    return results
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Returns {case: [reasons]} for every case slower or hungrier than its baseline."""
+    regressions = {}
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        reasons = []
+        slower = result["p50_ms"] - base["p50_ms"]
+        if result["p50_ms"] > max(base["p50_ms"] * (1 + tolerance), base["p95_ms"]) and slower > LATENCY_FLOOR_MS:
+            reasons.append(f"p50 {base['p50_ms']:.3f} -> {result['p50_ms']:.3f} ms")
+        if result["peak_kib"] > base["peak_kib"] * (1 + tolerance) and result["peak_kib"] - base["peak_kib"] > MEMORY_FLOOR_KIB:
+            reasons.append(f"peak {base['peak_kib']:.0f} -> {result['peak_kib']:.0f} KiB")
+        if reasons:
+            regressions[name] = reasons
+    return regressions
+
+def format_row(name, r):
+    return (f"{name:<48} {r['rows']:>7} {r['calls']:>6} {r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f} "
+            f"{r['p99_ms']:>10.3f} {r['rows_per_s']:>12.0f} {r['peak_kib']:>10.0f}")
+
+def header():
+    return (f"{'case':<48} {'rows':>7} {'calls':>6} {'p50 ms':>10} {'p95 ms':>10} "
+            f"{'p99 ms':>10} {'rows/s':>12} {'peak KiB':>10}")
+
+def environment():
+    import xgboost
+    from scripts.config import get_setting
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "xgboost": xgboost.__version__,
+        "inference_backend": get_setting("INFERENCE_BACKEND", "xgboost"),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the forecast pipeline against recorded feed fixtures.")
+    parser.add_argument("--filter", default=None, help="Only run cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=200, help="Maximum timed calls per case")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="Directory with metar.json, taf.json and hrrr.csv")
+    parser.add_argument("--backend", choices=["xgboost", "inplace", "flat"], default=None,
+                        help="INFERENCE_BACKEND to benchmark (default: the configured one)")
+    parser.add_argument("--out", default=None, help="Write the results as JSON (usable as a baseline)")
+    parser.add_argument("--baseline", default=None, help="Compare against a JSON written by --out")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown or memory growth before a case counts as a regression")
+    args = parser.parse_args(argv)
+
+    if args.backend:
+        os.environ["INFERENCE_BACKEND"] = args.backend
+
+    print(header())
+    results = run_benchmarks(args.filter, args.repeat, args.fixtures)
+    report = {"environment": environment(), "results": results}
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.tolerance)
+        missing = sorted(set(baseline["results"]) - set(results))
+        if missing and not args.filter:
+            print(f"Not in this run: {', '.join(missing)}")
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {args.baseline} (tolerance {args.tolerance:.0%}):")
+            for name, reasons in regressions.items():
+                print(f"  {name}: {'; '.join(reasons)}")
+            return 1
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import functools
+import inspect
+import threading
+import time
+from scripts import metrics
+
+class _InFlight:
+    """A fetch in progress that other callers for the same key can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+    def wait(self, timeout=None):
+        if not self.done.wait(timeout):
+            raise TimeoutError(f"fetch still running after {timeout:.0f}s")
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+class TTLCache:
+    """Thread-safe TTL cache shared across sessions.
+
+    Concurrent misses for the same key are coalesced: one caller fetches, the others
+    wait for its result (for at most wait_timeout seconds, then they get the expired
+    value if there is one). Failed fetches are never cached.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}   # key -> (expires_at, value)
+        self._inflight = {}  # key -> _InFlight
+
+    def get_or_fetch(self, key, ttl, fetch, wait_timeout=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                metrics.count("cache_requests_total", source=key[0], result="hit")
+                return entry[1]
+
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _InFlight()
+
+        # A caller that waits for another's fetch shares it without going upstream
+        metrics.count("cache_requests_total", source=key[0], result="miss" if leader else "coalesced")
+        if not leader:
+            try:
+                return call.wait(wait_timeout)
+            except TimeoutError:
+                # A hung leader must not hold every follower (and its pool worker) with it
+                with self._lock:
+                    entry = self._entries.get(key)
+                if entry is None:
+                    raise
+                metrics.count("cache_requests_total", source=key[0], result="stale")
+                return entry[1]
+
+        try:
+            call.value = fetch()
+            with self._lock:
+                self._entries[key] = (time.monotonic() + ttl, call.value)
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.done.set()
+
+    def invalidate(self, source=None):
+        """Drops cached entries, either all of them or only those of one source."""
+        with self._lock:
+            for key in list(self._entries):
+                if source is None or key[0] == source:
+                    del self._entries[key]
+
+# Process-wide cache for upstream data sources
+source_cache = TTLCache()
+
+def cached_source(source, ttl, wait_timeout=None):
+    """Decorator caching a data-source fetch for ttl seconds, keyed by source name and arguments.
+
+    Arguments are bound to the signature with defaults applied, so f(), f(default) and
+    f(x=default) share one entry. A caller that finds the same fetch already running waits
+    for it at most wait_timeout seconds. Cached values are shared between sessions and must
+    not be mutated by callers.
+    """
+    def decorator(fetch):
+        signature = inspect.signature(fetch)
+
+        @functools.wraps(fetch)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (source, tuple(bound.arguments.items()))
+            return source_cache.get_or_fetch(key, ttl, lambda: fetch(*args, **kwargs), wait_timeout)
+        return wrapper
+    return decorator
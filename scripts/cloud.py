@@ -2,34 +2,16 @@ import streamlit as st
 import requests
 import pandas as pd
 import plotly.express as px
-from io import StringIO
 
-# API Endpoint
-BASE_URL = "https://spotwx.io/api.php"
+from scripts.sources import request_cloud_data
 
 def fetch_cloud_data():
     """Fetches cloud/weather data from the SpotWX API (CSV format)."""
-    params = {
-        "key": st.secrets["API_KEY"],
-        "lat": 46.4392,
-        "lon": -63.8413,
-        "model": "hrrr"
-    }
-    
     try:
-        response = requests.get(BASE_URL, params=params)
-        response.raise_for_status()  # Raise an error for bad responses (4xx, 5xx)
-        
-        if not response.text.strip():
-            st.error("⚠ API returned an empty response.")
-            return pd.DataFrame()
-
-        # Convert CSV response to DataFrame
-        csv_data = StringIO(response.text)
-        df = pd.read_csv(csv_data)
-
-        return df  # Return the DataFrame
-    
+        return request_cloud_data()
+    except ValueError as e:
+        st.error(f"⚠ {e}")
+        return pd.DataFrame()
     except requests.exceptions.RequestException as e:
         st.error(f"⚠ Error fetching cloud data: {e}")
         return pd.DataFrame()
@@ -0,0 +1,68 @@
+import os
+import sys
+import threading
+
+SECRETS_FILE = os.path.join(".streamlit", "secrets.toml")
+
+_lock = threading.Lock()
+_file_settings = None
+
+def _load_file_settings():
+    """Reads .env and .streamlit/secrets.toml once, without importing Streamlit."""
+    settings = {}
+    try:
+        from dotenv import dotenv_values
+        settings.update({k: v for k, v in dotenv_values(".env").items() if v is not None})
+    except ImportError:
+        pass
+
+    if os.path.exists(SECRETS_FILE):
+        try:
+            import tomllib  # Python 3.11+
+        except ImportError:
+            tomllib = None
+        if tomllib is not None:
+            with open(SECRETS_FILE, "rb") as f:
+                for name, value in tomllib.load(f).items():
+                    settings.setdefault(name, value)
+    return settings
+
+def _streamlit_secret(name):
+    """Asks Streamlit's own secrets loader, but only inside the app or without tomllib.
+
+    Headless runs never pay the Streamlit import just to look up a setting.
+    """
+    if "streamlit" not in sys.modules and sys.version_info >= (3, 11):
+        return None
+    try:
+        import streamlit as st
+        return st.secrets[name]
+    except Exception:
+        return None
+
+def get_setting(name, default=None):
+    """Resolves a setting lazily: environment, then .env, then .streamlit/secrets.toml.
+
+    Nothing is read until a setting is first needed, so importing a module never fails
+    because a secret is missing. Raises KeyError if the setting is required and unset.
+    """
+    global _file_settings
+
+    value = os.environ.get(name)
+    if value is not None:
+        return value
+
+    if _file_settings is None:
+        with _lock:
+            if _file_settings is None:
+                _file_settings = _load_file_settings()
+    if name in _file_settings:
+        return _file_settings[name]
+
+    value = _streamlit_secret(name)
+    if value is not None:
+        return value
+
+    if default is not None:
+        return default
+    raise KeyError(f"Setting '{name}' is not configured (set it in the environment, .env or {SECRETS_FILE}).")
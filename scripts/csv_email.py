@@ -1,9 +1,9 @@
 import smtplib
-import streamlit as st
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
 from email import encoders
+from scripts.config import get_setting
 
 # SMTP server configuration
 SMTP_PORT = 587
@@ -25,11 +25,11 @@ def send_email(recipient, csv_buffer, filename):
         # Connect to the SMTP server and start TLS encryption
         with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
             server.starttls()
-            server.login(st.secrets["EMAIL_FROM"], st.secrets["PSW"])
+            server.login(get_setting("EMAIL_FROM"), get_setting("PSW"))
 
             # Create the email message
             msg = MIMEMultipart()
-            msg['From'] = st.secrets["EMAIL_FROM"]
+            msg['From'] = get_setting("EMAIL_FROM")
             msg['To'] = recipient
             msg['Subject'] = "4Hr Solar Energy Predictions"
 
@@ -49,7 +49,7 @@ def send_email(recipient, csv_buffer, filename):
             msg.attach(attachment)
 
             # Send the email
-            server.sendmail(st.secrets["EMAIL_FROM"], recipient, msg.as_string())
+            server.sendmail(get_setting("EMAIL_FROM"), recipient, msg.as_string())
 
     except Exception as e:
         print(f"Error sending email: {e}")
@@ -0,0 +1,43 @@
+import pandas as pd
+import streamlit as st
+from scripts import metrics
+
+def show_diagnostics():
+    """Displays per-stage timings, cache hit rates and upstream health for this server process."""
+
+    st.title("🩺 Diagnostics")
+    data = metrics.snapshot()
+
+    st.subheader("⏱️ Pipeline stages")
+    if data["stages"]:
+        stages = pd.DataFrame.from_dict(data["stages"], orient="index").rename_axis("stage")
+        stages[["total_s", "duration_p50_s", "duration_p95_s", "duration_max_s"]] *= 1000
+        stages.columns = ["Calls", "Failures", "Total (ms)", "p50 (ms)", "p95 (ms)", "Max (ms)"]
+        st.dataframe(stages.sort_values("Total (ms)", ascending=False).round(2))
+    else:
+        st.info("No stage has run in this process yet.")
+
+    st.subheader("🗄️ Source cache")
+    cache = [c for c in data["counters"] if c["name"] == "cache_requests_total"]
+    if cache:
+        counts = pd.DataFrame([{**c["labels"], "count": c["value"]} for c in cache])
+        counts = counts.pivot_table(index="source", columns="result", values="count", aggfunc="sum", fill_value=0)
+        counts["hit rate"] = (counts.get("hit", 0) / counts.sum(axis=1)).round(3)
+        st.dataframe(counts)
+    else:
+        st.info("No cached source has been requested yet.")
+
+    st.subheader("🌐 Upstream feeds")
+    if data["upstream"]:
+        upstream = pd.DataFrame.from_dict(data["upstream"], orient="index").rename_axis("host")
+        upstream["status_codes"] = upstream["status_codes"].map(
+            lambda codes: ", ".join(f"{code}: {n}" for code, n in sorted(codes.items())))
+        st.dataframe(upstream)
+    else:
+        st.info("No upstream request has been made yet.")
+
+    with st.expander("📄 Prometheus export"):
+        st.code(metrics.prometheus_text(data), language="plaintext")
+    if st.button("🔄 Reset counters"):
+        metrics.reset()
+        st.rerun()
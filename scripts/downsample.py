@@ -0,0 +1,119 @@
+import threading
+import weakref
+import numpy as np
+
+# Upper bound on points per trace sent to the browser
+MAX_POINTS = 1000
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: indices of `threshold` points that keep the shape of y(x).
+
+    x must be increasing (e.g. int64 nanoseconds). The first and last points are always kept.
+    Each bucket's pick depends on the previous one, so the triangle areas of every bucket are
+    computed at once from the previous picks and recomputed until no pick changes: the result
+    is exactly sequential LTTB, usually after a handful of passes.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)  # Buckets between the fixed endpoints
+
+    # The next bucket's average is the third vertex of each triangle (the last point for the last bucket)
+    sizes = np.diff(np.append(edges, n))
+    avg_x = (np.add.reduceat(x, edges) / sizes)[1:, None]
+    avg_y = (np.add.reduceat(y, edges) / sizes)[1:, None]
+
+    # Buckets as rows of a padded matrix
+    starts = edges[:-1]
+    columns = np.arange(sizes[:-1].max())
+    rows = starts[:, None] + columns
+    padding = columns >= sizes[:-1, None]
+    rows[padding] = starts[np.nonzero(padding)[0]]
+    bucket_x, bucket_y = x[rows], y[rows]
+
+    picks = starts
+    for _ in range(len(starts)):
+        previous = np.concatenate(([0], picks[:-1]))
+        x_prev, y_prev = x[previous][:, None], y[previous][:, None]
+        area = np.abs((x_prev - avg_x) * (bucket_y - y_prev) - (x_prev - bucket_x) * (avg_y - y_prev))
+        area[padding | np.isnan(area)] = -np.inf
+        new_picks = starts + area.argmax(axis=1)
+        if np.array_equal(new_picks, picks):
+            break
+        picks = new_picks
+    return np.concatenate(([0], picks, [n - 1]))
+
+def lttb_columns(x, columns, max_points):
+    """LTTB per column, sharing max_points between them: the sorted union of every column's picks."""
+    if not columns:
+        return np.arange(min(len(x), max_points))
+    per_column = max(3, max_points // len(columns))
+    return np.unique(np.concatenate([lttb(x, y, per_column) for y in columns]))
+
+class MultiResolution:
+    """Hourly data with pre-aggregated daily and weekly min/mean/max, built once per table.
+
+    series() picks the finest resolution that fits within max_points for the requested range.
+    """
+
+    def __init__(self, frame, time_column="timestamp"):
+        self.time_column = time_column
+        self.hourly = frame
+        indexed = frame.set_index(time_column)
+        self.aggregates = {
+            "daily": indexed.resample("D").agg(["min", "mean", "max"]),
+            "weekly": indexed.resample("W-MON", label="left", closed="left").agg(["min", "mean", "max"]),
+        }
+        self._periods = {}
+
+    def period_labels(self, freq):
+        """Period labels (e.g. '2025Q3') of every hourly row, computed once per frequency."""
+        labels = self._periods.get(freq)
+        if labels is None:
+            labels = self.hourly[self.time_column].dt.to_period(freq).astype(str).to_numpy()
+            self._periods[freq] = labels
+        return labels
+
+    def series(self, start, end, columns, max_points=MAX_POINTS):
+        """Returns (frame, resolution) for start <= t < end with at most max_points rows.
+
+        For "hourly" the frame has the raw columns; up to three times max_points hours are
+        LTTB-downsampled instead, each column keeping its share of the points. Longer ranges use the "daily" or
+        "weekly" aggregates, with (column, stat) columns for min, mean and max.
+        """
+        times = self.hourly[self.time_column]
+        hourly = self.hourly[(times >= start) & (times < end)]
+        if len(hourly) <= max_points:
+            return hourly[[self.time_column] + columns], "hourly"
+        if len(hourly) <= 3 * max_points:
+            keep = lttb_columns(hourly[self.time_column].to_numpy().astype(np.int64),
+                                [hourly[column].to_numpy() for column in columns], max_points)
+            return hourly[[self.time_column] + columns].iloc[keep], "hourly"
+
+        for resolution in ("daily", "weekly"):
+            agg = self.aggregates[resolution]
+            agg = agg[(agg.index >= start) & (agg.index < end)][columns]
+            if len(agg) <= max_points or resolution == "weekly":
+                break
+        if len(agg) > max_points:
+            keep = lttb_columns(agg.index.asi8, [agg[(column, "mean")].to_numpy() for column in columns], max_points)
+            agg = agg.iloc[keep]
+        return agg.rename_axis(self.time_column).reset_index(), resolution
+
+# Keyed weakly by the source object (e.g. a SolarTable), so a reloaded table drops its old store
+_stores = weakref.WeakKeyDictionary()
+_stores_lock = threading.Lock()
+
+def get_multi_resolution(key, frame, time_column="timestamp"):
+    """Returns the MultiResolution shared by every session for key, building it on first use."""
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                store = MultiResolution(frame, time_column)
+                _stores[key] = store
+    return store
@@ -0,0 +1,168 @@
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+import weakref
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Allowed gap between the flattened trees and Booster.inplace_predict (float32 sums over 200 trees)
+PARITY_ATOL = 1e-2
+PARITY_RTOL = 1e-5
+
+class FlatTrees:
+    """An XGBoost regression booster flattened into NumPy node arrays.
+
+    Every tree's nodes live in shared vectors (feature, threshold, children, default
+    direction, leaf value); rows are pushed through all trees at once, one tree level
+    per step, so a prediction costs a few dozen array operations and no DMatrix.
+    """
+
+    def __init__(self, feature, threshold, left, right, default_left, roots, base_score, max_depth, feature_names):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.roots = roots
+        self.base_score = base_score
+        self.max_depth = max_depth
+        self.feature_names = feature_names
+
+    @classmethod
+    def from_booster(cls, booster):
+        """Exports a gbtree reg:squarederror booster (numerical splits only)."""
+        raw = json.loads(booster.save_raw("json"))
+        learner = raw["learner"]
+        trees = learner["gradient_booster"]["model"]["trees"]
+        if learner["objective"]["name"] != "reg:squarederror":
+            raise ValueError(f"Unsupported objective {learner['objective']['name']}")
+
+        feature, threshold, left, right, default_left, roots = [], [], [], [], [], []
+        offset, max_depth = 0, 0
+        for tree in trees:
+            if any(tree.get("split_type", [])):
+                raise ValueError("Categorical splits are not supported")
+            lc = np.asarray(tree["left_children"], dtype=np.int32)
+            rc = np.asarray(tree["right_children"], dtype=np.int32)
+            leaf = lc == -1
+            roots.append(offset)
+            feature.append(np.where(leaf, 0, tree["split_indices"]).astype(np.int32))
+            threshold.append(np.asarray(tree["split_conditions"], dtype=np.float32))  # Leaf value on leaves
+            # Leaves point at themselves, so traversal can run a fixed number of steps
+            self_index = np.arange(len(lc), dtype=np.int32) + offset
+            left.append(np.where(leaf, self_index, lc + offset))
+            right.append(np.where(leaf, self_index, rc + offset))
+            default_left.append(np.asarray(tree["default_left"], dtype=bool))
+            max_depth = max(max_depth, _depth(lc, rc))
+            offset += len(lc)
+
+        return cls(
+            feature=np.concatenate(feature), threshold=np.concatenate(threshold),
+            left=np.concatenate(left), right=np.concatenate(right),
+            default_left=np.concatenate(default_left), roots=np.asarray(roots, dtype=np.int32),
+            base_score=np.float32(float(learner["learner_model_param"]["base_score"])),
+            max_depth=max_depth, feature_names=list(learner.get("feature_names") or booster.feature_names),
+        )
+
+    def predict(self, X):
+        """Raw predictions (float32) for an (n, n_features) array in feature_names order."""
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.max_depth):
+            values = X[rows, self.feature[nodes]]
+            go_left = np.where(np.isnan(values), self.default_left[nodes], values < self.threshold[nodes])
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.threshold[nodes].sum(axis=1, dtype=np.float32) + self.base_score
+
+    def save(self, path):
+        np.savez(path, feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+                 default_left=self.default_left, roots=self.roots, base_score=self.base_score,
+                 max_depth=self.max_depth, feature_names=np.asarray(self.feature_names))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(data["feature"], data["threshold"], data["left"], data["right"], data["default_left"],
+                   data["roots"], np.float32(data["base_score"]), int(data["max_depth"]),
+                   [str(name) for name in data["feature_names"]])
+
+def _depth(left, right):
+    """Depth (number of splits on the longest root-to-leaf path) of one tree."""
+    depth, frontier = 0, [0]
+    while True:
+        frontier = [child for node in frontier if left[node] != -1 for child in (left[node], right[node])]
+        if not frontier:
+            return depth
+        depth += 1
+
+def probe_rows(flat, n=512, seed=0):
+    """Rows spread over every feature's split thresholds (plus some missing values) for parity checks."""
+    rng = np.random.default_rng(seed)
+    X = np.empty((n, len(flat.feature_names)), dtype=np.float32)
+    splits = flat.left != np.arange(len(flat.left))
+    for j in range(X.shape[1]):
+        thresholds = flat.threshold[splits & (flat.feature == j)]
+        low, high = (thresholds.min() - 1, thresholds.max() + 1) if len(thresholds) else (0.0, 1.0)
+        X[:, j] = rng.uniform(low, high, n)
+    X[rng.random(X.shape) < 0.02] = np.nan
+    return X
+
+def check_parity(flat, booster, X=None):
+    """Returns the largest absolute difference to Booster.inplace_predict, raising if out of tolerance."""
+    X = probe_rows(flat) if X is None else np.asarray(X, dtype=np.float32)
+    expected = booster.inplace_predict(X)
+    actual = flat.predict(X)
+    if not np.allclose(actual, expected, rtol=PARITY_RTOL, atol=PARITY_ATOL):
+        raise ValueError(f"Flattened trees differ from the booster by up to {np.abs(actual - expected).max():.4g}")
+    return float(np.abs(actual - expected).max())
+
+# One flattened copy per loaded booster; dropped together with the booster on a model reload
+_flat = weakref.WeakKeyDictionary()
+_flat_lock = threading.Lock()
+
+def flat_trees_for(booster):
+    """Returns the parity-checked FlatTrees for booster, or None if it cannot be flattened exactly."""
+    with _flat_lock:
+        if booster not in _flat:
+            try:
+                flat = FlatTrees.from_booster(booster)
+                difference = check_parity(flat, booster)
+                logger.info(f"Flattened {len(flat.roots)} trees (max depth {flat.max_depth}); parity within {difference:.2g}")
+            except Exception as e:
+                logger.warning(f"Flattened tree backend unavailable ({e}); using inplace_predict.")
+                flat = None
+            _flat[booster] = flat
+        return _flat[booster]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export model.pkl as flattened NumPy trees and check them.")
+    parser.add_argument("--model", default="model.pkl")
+    parser.add_argument("--out", default=None, help="Write the flattened trees to this .npz file")
+    parser.add_argument("--repeat", type=int, default=1000, help="Single-row predictions to time")
+    args = parser.parse_args(argv)
+
+    import joblib
+    booster = joblib.load(args.model)
+    flat = FlatTrees.from_booster(booster)
+    print(f"{len(flat.roots)} trees, {len(flat.feature)} nodes, max depth {flat.max_depth}")
+    print(f"Parity vs inplace_predict: max |diff| = {check_parity(flat, booster):.3g}")
+
+    row = probe_rows(flat, n=1)
+    for name, predict in [("flat", flat.predict), ("inplace_predict", booster.inplace_predict)]:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            predict(row)
+        print(f"{name}: {(time.perf_counter() - start) / args.repeat * 1e6:.0f} µs per single-row prediction")
+
+    if args.out:
+        flat.save(args.out)
+        print(f"Wrote {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+import argparse
+import logging
+import sys
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+from scripts.config import get_setting
+from scripts.intervals import prediction_intervals
+from scripts.model import load_model, predict_power_batch
+from scripts.weather import extract_weather_features_frame
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HORIZON = 4
+# HRRR runs out to 18 hours, so that is as far ahead as the extended mode can see
+MAX_HORIZON = 18
+
+DIFF_COLUMNS = ['Hour', 'Change', 'Previous Power (kW)', 'Predicted Power (kW)', 'Changed Features']
+
+def forecast_frame(features_df, predictions):
+    """Assembles the forecast table: validity window, predicted power, P10/P50/P90 band, then the model features."""
+    frame = pd.DataFrame({
+        'Validity': [f"{hr:02d}00 - {(hr+1)%24:02d}00" for hr in features_df['timehr']],
+        'Predicted Power (kW)': predictions.astype(float).round(2),
+    })
+    bands = prediction_intervals(predictions, features_df['tmaxGHI'].to_numpy()).round(2)
+    return pd.concat([frame, bands, features_df.reset_index(drop=True)], axis=1)
+
+def build_features(horizon=DEFAULT_HORIZON, **feature_kwargs):
+    """Builds the feature matrix for `horizon` hourly rows; empty when no weather data is available.
+
+    Every horizon uses the same HRRR series blended with TAF/METAR, so a longer horizon
+    only appends hours: the first rows are identical whatever the horizon.
+    """
+    if not 1 <= horizon <= MAX_HORIZON:
+        raise ValueError(f"horizon must be between 1 and {MAX_HORIZON} hours, got {horizon}")
+    return extract_weather_features_frame(horizon, **feature_kwargs)
+
+def run_forecast(horizon=DEFAULT_HORIZON, **feature_kwargs):
+    """Runs the full pipeline (fetch, features, batched inference) without any UI.
+
+    Returns an empty DataFrame when no weather data is available.
+    """
+    features_df = build_features(horizon, **feature_kwargs)
+    if features_df.empty:
+        return pd.DataFrame()
+
+    model, expected_features = load_model()
+    predictions = predict_power_batch(model, expected_features, features_df)
+    return forecast_frame(features_df, predictions)
+
+class IncrementalForecast:
+    """Keeps the previous feature matrix and predictions so an update only re-scores changed hours.
+
+    Rows are keyed by their valid hour. Each update rebuilds the (cheap, vectorized)
+    features, compares them with the previous run, and sends only the new or changed
+    hours to the model; a replaced model file or a new INFERENCE_BACKEND re-scores everything.
+    """
+
+    def __init__(self, horizon=DEFAULT_HORIZON):
+        self.horizon = horizon
+        self.versions = None
+        self._model = None
+        self._backend = None
+        self._features = None
+        self._predictions = None
+
+    def update(self, sources, current_time, versions=None):
+        """Returns (forecast frame, diff, number of hours re-scored).
+
+        The diff has one row per added, changed or removed hour with the previous and new
+        predicted power and the features that changed.
+        """
+        features_df = build_features(self.horizon, sources=sources, current_time=current_time)
+        if features_df.empty:
+            return pd.DataFrame(), pd.DataFrame(columns=DIFF_COLUMNS), 0
+
+        hours = pd.DatetimeIndex([current_time + timedelta(hours=i) for i in range(len(features_df))])
+        # Floor in UTC: unambiguous across DST changes, and Atlantic offsets are whole hours
+        hours = hours.tz_convert("UTC").floor("h").tz_convert(hours.tz) if hours.tz is not None else hours.floor("h")
+        features_df.index = hours
+        model, expected_features = load_model()
+        backend = get_setting("INFERENCE_BACKEND", "xgboost")
+
+        predictions = pd.Series(np.nan, index=hours)
+        previous = self._features if model is self._model and backend == self._backend else None
+        if previous is not None and list(previous.columns) == list(features_df.columns):
+            common = hours.intersection(previous.index)
+            old, new = previous.loc[common].to_numpy(dtype=float), features_df.loc[common].to_numpy(dtype=float)
+            unchanged = common[((old == new) | (np.isnan(old) & np.isnan(new))).all(axis=1)]
+            predictions.loc[unchanged] = self._predictions.loc[unchanged]
+
+        stale = predictions.index[predictions.isna()]
+        if len(stale):
+            predictions.loc[stale] = predict_power_batch(model, expected_features, features_df.loc[stale])
+
+        diff = self._diff(features_df, predictions)
+        self._model, self._backend, self.versions = model, backend, versions
+        self._features, self._predictions = features_df, predictions
+        return forecast_frame(features_df.reset_index(drop=True), predictions.to_numpy()), diff, len(stale)
+
+    def _diff(self, features_df, predictions):
+        rows = []
+        previous = self._features if self._features is not None else features_df.iloc[:0]
+        for hour in features_df.index.union(previous.index):
+            if hour not in previous.index:
+                change, changed = "added", []
+            elif hour not in features_df.index:
+                change, changed = "removed", []
+            else:
+                old, new = previous.loc[hour], features_df.loc[hour]
+                changed = [name for name in features_df.columns if not (old[name] == new[name] or (pd.isna(old[name]) and pd.isna(new[name])))]
+                if not changed:
+                    continue
+                change = "changed"
+            rows.append({
+                'Hour': hour.isoformat(),
+                'Change': change,
+                'Previous Power (kW)': round(float(self._predictions[hour]), 2) if change != "added" else None,
+                'Predicted Power (kW)': round(float(predictions[hour]), 2) if change != "removed" else None,
+                'Changed Features': changed,
+            })
+        return pd.DataFrame(rows, columns=DIFF_COLUMNS)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the solar power forecast without the Streamlit UI.")
+    parser.add_argument("--horizon", type=int, default=DEFAULT_HORIZON, help=f"Number of hourly rows to forecast (1-{MAX_HORIZON})")
+    parser.add_argument("--out", default=None, help="Output file (.csv or .json); prints CSV to stdout if omitted")
+    args = parser.parse_args(argv)
+    if not 1 <= args.horizon <= MAX_HORIZON:
+        parser.error(f"--horizon must be between 1 and {MAX_HORIZON}")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    df = run_forecast(args.horizon)
+    if df.empty:
+        logger.error("No weather data available for predictions.")
+        return 1
+
+    if args.out is None:
+        df.to_csv(sys.stdout, index=False)
+    elif args.out.endswith(".json"):
+        df.to_json(args.out, orient="records", indent=2)
+    else:
+        df.to_csv(args.out, index=False)
+    if args.out:
+        logger.info(f"Wrote {len(df)} forecast rows to {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import Counter, deque
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from scripts import replay
+from scripts.config import get_setting
+
+# (connect, read) timeouts in seconds applied to every upstream request
+DEFAULT_TIMEOUT = (3.05, 10)
+
+# Longest Retry-After (seconds) honoured before a retry; a larger value would block a
+# fetch worker past the per-source time budgets, which cannot interrupt the sleep
+MAX_RETRY_AFTER = 5.0
+
+class CappedRetry(Retry):
+    """Retry that honours Retry-After only up to MAX_RETRY_AFTER seconds."""
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        return min(retry_after, MAX_RETRY_AFTER) if retry_after is not None else None
+
+# Bounded exponential backoff (0.5s, 1s, 2s) on rate limiting and server errors
+RETRY = CappedRetry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET"}),
+    respect_retry_after_header=True,
+    raise_on_status=False,  # Hand the final response back so callers can raise_for_status()
+)
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+def get_session(host):
+    """Returns the pooled keep-alive session for a host, creating it on first use."""
+    session = _sessions.get(host)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=10, max_retries=RETRY)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _sessions[host] = session
+    return session
+
+class _HostMetrics:
+    """Request counters, status codes, payload sizes and recent latencies for one upstream host."""
+
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.last_status = None
+        self.status_codes = Counter()
+        self.bytes = 0
+        self.last_bytes = None
+        self.latencies = deque(maxlen=500)
+
+    def snapshot(self):
+        latencies = sorted(self.latencies)
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else None
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "last_status": self.last_status,
+            "status_codes": {str(code): n for code, n in self.status_codes.items()},
+            "bytes": self.bytes,
+            "last_bytes": self.last_bytes,
+            "latency_p50_s": pct(0.50),
+            "latency_p95_s": pct(0.95),
+            "latency_max_s": latencies[-1] if latencies else None,
+        }
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+def _record(host, seconds, status, failed, size=None):
+    with _metrics_lock:
+        metrics = _metrics.setdefault(host, _HostMetrics())
+        metrics.requests += 1
+        metrics.failures += int(failed)
+        metrics.last_status = status
+        metrics.status_codes[status if status is not None else "error"] += 1
+        if size is not None:
+            metrics.bytes += size
+            metrics.last_bytes = size
+        metrics.latencies.append(seconds)
+
+def get_metrics():
+    """Returns per-host request counts, failures, status codes, bytes received and latency percentiles."""
+    with _metrics_lock:
+        return {host: metrics.snapshot() for host, metrics in _metrics.items()}
+
+def reset_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+
+def get(url, params=None, headers=None, timeout=DEFAULT_TIMEOUT, source=None):
+    """GETs url through the host's pooled session with timeouts, retries and metrics.
+
+    The HTTP_MODE setting switches the transport: "live" (the default), "record" (live,
+    and every response of a named source is also saved under HTTP_RECORDINGS) or
+    "replay" (the saved response of source for the replay clock, without any network).
+    """
+    mode = get_setting("HTTP_MODE", "live")
+    host = f"replay:{source}" if mode == "replay" else urlsplit(url).netloc
+    start = time.perf_counter()
+    try:
+        if mode == "replay":
+            response = replay.replay_response(source, url, get_setting("HTTP_RECORDINGS", replay.RECORDINGS_DIR))
+        else:
+            response = get_session(host).get(url, params=params, headers=headers, timeout=timeout)
+    except requests.exceptions.RequestException:
+        _record(host, time.perf_counter() - start, None, failed=True)
+        raise
+    # The body is already read (no streaming), so its size is free to take
+    _record(host, time.perf_counter() - start, response.status_code, failed=not response.ok, size=len(response.content))
+    if mode == "record" and source is not None:
+        replay.save_response(source, response, get_setting("HTTP_RECORDINGS", replay.RECORDINGS_DIR))
+    return response
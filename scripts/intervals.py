@@ -0,0 +1,106 @@
+import logging
+import os
+import threading
+import numpy as np
+import pandas as pd
+from scripts.table_cache import load_frame
+from scripts.weather import get_solar_params_batch
+
+logger = logging.getLogger(__name__)
+
+RESIDUALS_CSV = os.path.join("csv", "residuals.csv")
+QUANTILES = (0.1, 0.5, 0.9)
+INTERVAL_COLUMNS = ["P10 (kW)", "P50 (kW)", "P90 (kW)"]
+
+# tmaxGHI bins (Wh/m²): night, low sun, mid sun, high sun. The error grows with the
+# available irradiance, so each bin gets its own residual quantiles.
+TMAXGHI_BINS = np.array([0.0, 1.0, 300.0, 600.0])
+
+# Adjacent bins are merged until each holds at least this many residuals
+MIN_SAMPLES = 10
+
+def merge_sparse_bins(edges, counts, min_samples=MIN_SAMPLES):
+    """Drops inner daytime edges until every daytime bin holds min_samples residuals.
+
+    Bins are merged left to right; a short last bin joins the one before it. The night
+    bin (0) is never merged. Returns the new edges.
+    """
+    kept = [edges[0], edges[1]]
+    running = 0
+    for b in range(1, len(edges)):
+        if running >= min_samples:
+            kept.append(edges[b])
+            running = 0
+        running += counts[b]
+    if running < min_samples and len(kept) > 2:
+        kept.pop()
+    return np.array(kept)
+
+class ResidualQuantiles:
+    """P10/P50/P90 residual offsets per tmaxGHI bin, looked up with one searchsorted per batch.
+
+    The offsets are the raw residual quantiles, so the band keeps the model's bias: P50 is
+    the bias-corrected median and can differ from the point prediction.
+    """
+
+    def __init__(self, edges, offsets, counts):
+        self.edges = edges
+        self.offsets = offsets  # (bins, 3): residual quantiles (actual - predicted) per bin
+        self.counts = counts
+
+    @classmethod
+    def from_residuals(cls, residuals, tmaxghi, edges=TMAXGHI_BINS):
+        residuals = np.asarray(residuals, dtype=np.float64)
+        counts = np.bincount(np.clip(np.searchsorted(edges, tmaxghi, side="right") - 1, 0, None), minlength=len(edges))
+        merged = merge_sparse_bins(edges, counts)
+        if len(merged) < len(edges):
+            logger.warning(f"Residual bins {edges.tolist()} hold {counts.tolist()} samples; "
+                           f"merged to {merged.tolist()} for at least {MIN_SAMPLES} per daytime bin")
+        if counts[1:].sum() < MIN_SAMPLES:
+            logger.warning(f"Only {counts[1:].sum()} daytime residuals; prediction intervals are unreliable")
+
+        bins = np.clip(np.searchsorted(merged, tmaxghi, side="right") - 1, 0, None)
+        offsets = np.zeros((len(merged), len(QUANTILES)))
+        for b in range(1, len(merged)):  # Bin 0 is night: predictions are forced to 0 anyway
+            in_bin = residuals[bins == b]
+            if len(in_bin):
+                offsets[b] = np.quantile(in_bin, QUANTILES)
+        return cls(merged, offsets, np.bincount(bins, minlength=len(merged)))
+
+    def intervals(self, predictions, tmaxghi):
+        """Returns the P10/P50/P90 power (kW) for each prediction; 0 at night, never negative."""
+        predictions = np.asarray(predictions, dtype=np.float64)
+        bins = np.clip(np.searchsorted(self.edges, np.asarray(tmaxghi, dtype=np.float64), side="right") - 1, 0, None)
+        bands = predictions[:, None] + self.offsets[bins]
+        bands[bins == 0] = 0.0
+        # Quantiles of a sum are monotonic, but clipping at 0 must keep P10 <= P50 <= P90
+        return pd.DataFrame(np.maximum.accumulate(bands.clip(min=0), axis=1), columns=INTERVAL_COLUMNS)
+
+_quantiles_lock = threading.Lock()
+_quantiles = {}
+
+def get_residual_quantiles(path=RESIDUALS_CSV):
+    """Returns the ResidualQuantiles of path, recomputed only when the residuals CSV changes.
+
+    tmaxGHI is joined to the residuals by timestamp from the solar table (or the analytic
+    geometry for hours outside it). Returns None if there are no residuals.
+    """
+    if not os.path.exists(path):
+        return None
+    frame = load_frame(path, "Timestamp")
+    with _quantiles_lock:
+        entry = _quantiles.get(path)
+        if entry is None or entry[0] is not frame:
+            tmaxghi = get_solar_params_batch(frame["Timestamp"])["tmaxGHI"].to_numpy()
+            quantiles = ResidualQuantiles.from_residuals(frame["Residuals"].to_numpy(), tmaxghi)
+            logger.info(f"Residual quantiles from {len(frame)} rows (per bin: {quantiles.counts.tolist()})")
+            entry = (frame, quantiles)
+            _quantiles[path] = entry
+    return entry[1]
+
+def prediction_intervals(predictions, tmaxghi):
+    """P10/P50/P90 columns for a batch of predictions, or an empty frame if no residuals are available."""
+    quantiles = get_residual_quantiles()
+    if quantiles is None:
+        return pd.DataFrame(index=range(len(predictions)))
+    return quantiles.intervals(predictions, tmaxghi)
@@ -1,5 +1,43 @@
+import argparse
+import hashlib
+import logging
+import os
+import sys
+import tempfile
 import streamlit as st
-import pandas as pd
+from scripts.sites import capacity_table, load_capacity_table, scale_file
+
+logger = logging.getLogger(__name__)
+
+# Rows read from the upload at a time
+CHUNK_ROWS = 50_000
+
+# Irrelevant Columns are skipped while parsing
+COLUMNS_TO_REMOVE = [
+    "temperature_celsius", "humidity_percent", "wind_speed_kmph",
+    "wind_gust_kmph", "wind_direction_degrees", "visibility_meters_float",
+    "altimeter_hpa", "low_cloud_coverage", "mid_cloud_coverage",
+    "high_cloud_coverage", "solar_elevationdegrees", "solar_azimuthdegrees",
+    "solar_declinationdegrees", "hour_angledegrees", "timehr", "tmaxGHI"
+]
+
+@st.cache_data(max_entries=4, show_spinner="Scaling the upload...")
+def scale_upload(digest, name, capacities, suffix, _upload):
+    """Scales an upload once per (file hash, capacities, format); reruns reuse the result.
+
+    Returns (rows, preview, output bytes). The download button needs the output in memory,
+    so pages are for moderate files; use `python -m scripts.location` for large ones.
+    """
+    _upload.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        out_path = tmp.name
+    try:
+        rows, preview = scale_file(_upload, name, out_path, capacities,
+                                   drop_columns=COLUMNS_TO_REMOVE, chunk_rows=CHUNK_ROWS)
+        with open(out_path, "rb") as f:
+            return rows, preview, f.read()
+    finally:
+        os.remove(out_path)
 
 def show_location_predictions():
     """Displays location-based power predictions in a Streamlit application."""
@@ -7,55 +45,56 @@ def show_location_predictions():
     st.title("📍 Location-based Power Prediction")
 
     # Streamlit UI: File Uploader
-    uploaded_file = st.file_uploader("Upload your CSV file", type=["csv"])
+    uploaded_file = st.file_uploader("Upload your CSV file", type=["csv", "parquet"])
 
     if uploaded_file is not None:
-        # Load DataFrame
-        df = pd.read_csv(uploaded_file)
-
-        # Drop Irrelevant Columns Efficiently
-        columns_to_remove = [
-            "temperature_celsius", "humidity_percent", "wind_speed_kmph",
-            "wind_gust_kmph", "wind_direction_degrees", "visibility_meters_float",
-            "altimeter_hpa", "low_cloud_coverage", "mid_cloud_coverage",
-            "high_cloud_coverage", "solar_elevationdegrees", "solar_azimuthdegrees",
-            "solar_declinationdegrees", "hour_angledegrees", "timehr", "tmaxGHI"
-        ]
-        df.drop(columns=[col for col in columns_to_remove if col in df.columns], inplace=True)
-
-        # Ensure 'Predicted Power (kW)' Column Exists
-        if "Predicted Power (kW)" not in df.columns:
-            st.error("❌ The uploaded CSV does not contain the required 'Predicted Power (kW)' column.")
-        else:
-            # Convert Predicted Power to List
-            preds_list = df["Predicted Power (kW)"].tolist()
-
-            # Sidebar User Inputs for Power Calculation
-            st.sidebar.header("Settings")
-
-            # Predefined Locations for Dropdown Selection
-            location_options = ["Brackley", "Slemon Park", "Rustico", "New Glasgow", "Crapaud"]
-
-            # Dropdown to Select Location
-            loc = st.sidebar.selectbox("Select Location", options=location_options, index=0)
-
-            # Numerical Inputs for Capacities
-            slemonpark_capacity = st.sidebar.number_input("Slemon Park Capacity (kW)", value=12500)
-            brackly_capacity = st.sidebar.number_input(f"{loc} Capacity (kW)", value=1000)
-
-            # Calculate Percentages for Location Power
-            percent_slemonpark = [power / slemonpark_capacity for power in preds_list]
-            percent_brackly = [power * brackly_capacity for power in percent_slemonpark]
-
-            # Add New Column to DataFrame
-            df[f'Predicted Power in {loc} (kW)'] = percent_brackly
-
-            # Display Data
-            st.success(f"✅ Data processed successfully for {loc}!")
-            st.dataframe(df)
-
-            # Allow Download of Processed Data
-            csv = df.to_csv(index=False).encode('utf-8')
-            st.download_button("📥 Download Processed CSV", data=csv, file_name=f"processed_location_data_{loc}.csv", mime="text/csv")
+        # Sidebar Settings: one row per site, extra rows with effective_from for capacity changes.
+        # Predictions are for the trained Slemon Park array; its row here is just another output site.
+        st.sidebar.header("Settings")
+        st.sidebar.caption("Site capacities (kW)")
+        capacities = st.sidebar.data_editor(capacity_table(), num_rows="dynamic", hide_index=True)
+        capacities = capacities.dropna(subset=["site", "capacity_kw"])
+
+        output_format = st.sidebar.radio("Output format", ["CSV", "Parquet"], horizontal=True)
+        suffix = ".parquet" if output_format == "Parquet" else ".csv"
+
+        # Scaled once per uploaded file and settings, not on every rerun
+        digest = hashlib.sha256(uploaded_file.getbuffer()).hexdigest()
+        try:
+            rows, preview, data = scale_upload(digest, uploaded_file.name, capacities, suffix, uploaded_file)
+        except (ValueError, ImportError) as e:
+            # Missing 'Predicted Power (kW)' column, unreadable file, or Parquet without pyarrow
+            st.error(f"❌ {e}")
+            return
+
+        # Display Data
+        st.success(f"✅ {rows} rows processed successfully for {capacities['site'].nunique()} sites!")
+        if rows > len(preview):
+            st.caption(f"Showing the first {len(preview)} rows; the download contains all of them.")
+        st.dataframe(preview)
+
+        # Allow Download of Processed Data
+        mime = "application/vnd.apache.parquet" if suffix == ".parquet" else "text/csv"
+        st.download_button(f"📥 Download Processed {output_format}", data=data,
+                           file_name=f"processed_location_data{suffix}", mime=mime)
     else:
         st.info("📂 Please upload a CSV file to proceed.")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scale a prediction file to every site, chunk by chunk.")
+    parser.add_argument("input", help="Prediction .csv or .parquet with a 'Predicted Power (kW)' column")
+    parser.add_argument("output", help="Output .csv or .parquet file")
+    parser.add_argument("--capacities", default=None,
+                        help="CSV with site, capacity_kw and optional effective_from (default: built-in sites)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    capacities = load_capacity_table(args.capacities) if args.capacities else capacity_table()
+    rows, _ = scale_file(args.input, args.input, args.output, capacities,
+                         drop_columns=COLUMNS_TO_REMOVE, chunk_rows=args.chunk_rows)
+    logger.info(f"Wrote {rows} rows for {capacities['site'].nunique()} sites to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,20 +4,16 @@ from datetime import datetime
 import pytz
 from dateutil import parser
 
-url2 = st.secrets["BASE_URL"]
-loc = st.secrets["LOCATION"]
-toc = st.secrets["TOKEN"]
+from scripts.config import get_setting
+from scripts.sources import request_metar_data
 
 def fetch_metar_data():
     """Fetches raw METAR JSON data from the API."""
-    url = f"{url2}/{loc}?token={toc}&format=json"
     try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            st.error("⚠ Failed to fetch METAR data.")
-            return {}
+        return request_metar_data()
+    except requests.exceptions.HTTPError:
+        st.error("⚠ Failed to fetch METAR data.")
+        return {}
     except Exception as e:
         st.error(f"⚠ Error fetching METAR data: {e}")
         return {}
@@ -82,7 +78,7 @@ def show_metar():
     with info_col2:
         st.info(f"🕒 **Time (PEI Time):** {pei_time.split(' ')[1] + ' ' + pei_time.split(' ')[2] if pei_time != 'Unavailable' else 'Unavailable'}")
     with info_col3:
-        st.info(f"📍 **Location:** {data.get('station', loc)}")
+        st.info(f"📍 **Location:** {data.get('station', get_setting('LOCATION'))}")
 
     # Weather Details (in 3 rows)
     st.markdown("---")
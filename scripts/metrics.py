@@ -0,0 +1,134 @@
+import contextlib
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Prefix of every exported metric name
+NAMESPACE = "solar"
+
+class _StageMetrics:
+    """Call count, failures, total time and recent durations of one pipeline stage."""
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.total_s = 0.0
+        self.durations = deque(maxlen=500)
+
+    def snapshot(self):
+        durations = sorted(self.durations)
+        def pct(p):
+            return durations[min(len(durations) - 1, int(p * len(durations)))] if durations else None
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "total_s": self.total_s,
+            "duration_p50_s": pct(0.50),
+            "duration_p95_s": pct(0.95),
+            "duration_max_s": durations[-1] if durations else None,
+        }
+
+_stages = {}
+_counters = {}  # (name, sorted label items) -> count
+_lock = threading.Lock()
+
+def record(stage, seconds, failed=False):
+    with _lock:
+        metrics = _stages.get(stage)
+        if metrics is None:
+            metrics = _stages[stage] = _StageMetrics()
+        metrics.calls += 1
+        metrics.failures += int(failed)
+        metrics.total_s += seconds
+        metrics.durations.append(seconds)
+
+@contextlib.contextmanager
+def timed(stage):
+    """Records the duration of a block (or, as a decorator, of every call) under stage.
+
+    A block that raises is counted as a failure and the exception propagates. Exceptions
+    outside Exception are control flow, not failures: Streamlit's st.rerun() and st.stop()
+    raise ScriptControlException (a BaseException), as do KeyboardInterrupt and SystemExit.
+    """
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except Exception:
+        failed = True
+        raise
+    finally:
+        record(stage, time.perf_counter() - start, failed)
+
+def count(name, value=1, **labels):
+    """Adds value to the counter name with the given labels, e.g. count("cache_requests_total", source="taf", result="hit")."""
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def snapshot():
+    """Returns every stage, counter and upstream host metric as plain JSON-ready data."""
+    from scripts.http_client import get_metrics
+    with _lock:
+        stages = {stage: metrics.snapshot() for stage, metrics in _stages.items()}
+        counters = [{"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(_counters.items())]
+    return {"stages": stages, "counters": counters, "upstream": get_metrics()}
+
+def reset():
+    """Clears every stage, counter and upstream host metric."""
+    from scripts.http_client import reset_metrics
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+    reset_metrics()
+
+def _labels(**labels):
+    escaped = {name: str(value).replace("\\", "\\\\").replace('"', '\\"') for name, value in labels.items()}
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped.items()) + "}"
+
+def prometheus_text(data=None):
+    """Renders a snapshot in the Prometheus text exposition format."""
+    data = data or snapshot()
+    lines = [f"# TYPE {NAMESPACE}_stage_duration_seconds summary"]
+    for stage, s in data["stages"].items():
+        for quantile, key in (("0.5", "duration_p50_s"), ("0.95", "duration_p95_s")):
+            if s[key] is not None:
+                lines.append(f"{NAMESPACE}_stage_duration_seconds{_labels(stage=stage, quantile=quantile)} {s[key]}")
+        lines.append(f"{NAMESPACE}_stage_duration_seconds_sum{_labels(stage=stage)} {s['total_s']}")
+        lines.append(f"{NAMESPACE}_stage_duration_seconds_count{_labels(stage=stage)} {s['calls']}")
+    lines.append(f"# TYPE {NAMESPACE}_stage_failures_total counter")
+    for stage, s in data["stages"].items():
+        lines.append(f"{NAMESPACE}_stage_failures_total{_labels(stage=stage)} {s['failures']}")
+
+    typed = set()
+    for counter in data["counters"]:
+        name = f"{NAMESPACE}_{counter['name']}"
+        if name not in typed:
+            lines.append(f"# TYPE {name} counter")
+            typed.add(name)
+        lines.append(f"{name}{_labels(**counter['labels'])} {counter['value']}")
+
+    upstream = data["upstream"]
+    for metric, key in (("upstream_requests_total", "requests"), ("upstream_failures_total", "failures"),
+                        ("upstream_response_bytes_total", "bytes")):
+        lines.append(f"# TYPE {NAMESPACE}_{metric} counter")
+        lines.extend(f"{NAMESPACE}_{metric}{_labels(host=host)} {h[key]}" for host, h in upstream.items())
+    lines.append(f"# TYPE {NAMESPACE}_upstream_responses_total counter")
+    for host, h in upstream.items():
+        lines.extend(f"{NAMESPACE}_upstream_responses_total{_labels(host=host, code=code)} {n}"
+                     for code, n in sorted(h["status_codes"].items()))
+    lines.append(f"# TYPE {NAMESPACE}_upstream_latency_seconds summary")
+    for host, h in upstream.items():
+        for quantile, key in (("0.5", "latency_p50_s"), ("0.95", "latency_p95_s")):
+            if h[key] is not None:
+                lines.append(f"{NAMESPACE}_upstream_latency_seconds{_labels(host=host, quantile=quantile)} {h[key]}")
+    return "\n".join(lines) + "\n"
+
+def log_snapshot():
+    """Logs the current snapshot as a single JSON line."""
+    logger.info(json.dumps({"metrics": snapshot()}, default=str))
@@ -1,37 +1,105 @@
-import joblib
-import xgboost as xgb
-import pandas as pd
+import os
+import threading
+import numpy as np
+from scripts import metrics
+from scripts.config import get_setting
+from scripts.flat_trees import flat_trees_for
 
-def load_model():
-    """Loads the trained XGBoost model and retrieves expected feature names."""
-    model = joblib.load("model.pkl")  # Directly loads an XGBoost Booster
+MODEL_PATH = "model.pkl"
 
-    # ✅ Directly extract feature names
-    expected_features = model.feature_names
+# Values of the INFERENCE_BACKEND setting
+INFERENCE_BACKENDS = ("xgboost", "inplace", "flat")
 
-    return model, expected_features  # Ensure two values are returned
+# Process-wide model registry, shared by every session and thread
+_registry_lock = threading.Lock()
+_registry = {"signature": None, "model": None, "expected_features": None}
 
-def predict_power(model, expected_features, features_df):
-    """Runs predictions using the XGBoost model."""
+def _file_signature(path):
+    """Returns a cheap fingerprint (mtime, size, inode) used to detect a replaced model file."""
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+def load_model(path=MODEL_PATH):
+    """Loads the trained XGBoost model and retrieves expected feature names.
+
+    The booster is unpickled once per process and shared across sessions and threads.
+    When the file on disk is replaced, the new model is loaded and swapped in atomically.
+    """
+    global _registry
+
+    signature = (path, _file_signature(path))
+    entry = _registry
+    if entry["signature"] == signature:
+        return entry["model"], entry["expected_features"]
+
+    with _registry_lock:
+        # Another thread may have reloaded while we waited for the lock
+        if _registry["signature"] != signature:
+            import joblib  # Heavy (pulls in xgboost when unpickling); only paid once a model is needed
+            try:
+                with metrics.timed("model_load"):
+                    model = joblib.load(path)  # Directly loads an XGBoost Booster
+            except Exception:
+                # A half-written file: keep serving the previous model and retry on the next call
+                if _registry["model"] is None:
+                    raise
+                return _registry["model"], _registry["expected_features"]
+
+            # ✅ Directly extract feature names
+            expected_features = model.feature_names
+
+            # Swap the whole entry in one assignment so readers never see a half-updated model
+            _registry = {"signature": signature, "model": model, "expected_features": expected_features}
+        entry = _registry
+
+    return entry["model"], entry["expected_features"]  # Ensure two values are returned
+
+@metrics.timed("inference")
+def predict_power_batch(model, expected_features, features_df):
+    """Runs predictions for every row of features_df in a single call.
+
+    The INFERENCE_BACKEND setting picks how: "xgboost" (DMatrix + predict, the default),
+    "inplace" (Booster.inplace_predict) or "flat" (flattened NumPy trees, for low latency).
+    Raises ValueError for any other value.
+    """
+    backend = get_setting("INFERENCE_BACKEND", "xgboost")
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Unknown INFERENCE_BACKEND {backend!r}; expected one of {', '.join(INFERENCE_BACKENDS)}")
 
     # ✅ Ensure the DataFrame matches the model's expected feature order
-    features_df = features_df[expected_features].copy()
+    features_df = features_df[expected_features]
 
     # Check where tmaxGHI is 0
     if 'tmaxGHI' in features_df.columns:
-        mask = features_df['tmaxGHI'] == 0
+        mask = (features_df['tmaxGHI'] == 0).to_numpy()
     else:
-        mask = pd.Series(False, index=features_df.index)  # Default to False if column is missing
+        mask = np.zeros(len(features_df), dtype=bool)  # Default to False if column is missing
 
-    # Convert to DMatrix
-    dmatrix_input = xgb.DMatrix(features_df, feature_names=expected_features)
+    metrics.count("inference_rows_total", len(features_df), backend=backend)
+    if backend == "flat":
+        # Flattened NumPy trees, parity-checked against the booster when first built
+        flat = flat_trees_for(model)
+        values = features_df.to_numpy(dtype=np.float32)
+        predictions = flat.predict(values) if flat is not None else model.inplace_predict(values)
+    elif backend == "inplace":
+        # Skips the DMatrix construction
+        predictions = model.inplace_predict(features_df.to_numpy(dtype=np.float32))
+    else:
+        import xgboost as xgb
 
-    # Predict power output
-    predictions = model.predict(dmatrix_input)
+        # Convert the whole batch to one DMatrix
+        dmatrix_input = xgb.DMatrix(features_df, feature_names=expected_features)
+
+        # Predict power output for every row at once
+        predictions = model.predict(dmatrix_input)
 
     # Apply mask: If tmaxGHI is 0, force prediction to be 0
     predictions[mask] = 0.0
 
     # Ensure non-negative output
-    return float(predictions.clip(min=0)[0])  # Extract the first (and only) value as a float
+    return predictions.clip(min=0)
 
+def predict_power(model, expected_features, features_df):
+    """Runs predictions using the XGBoost model."""
+    predictions = predict_power_batch(model, expected_features, features_df)
+    return float(predictions[0])  # Extract the first (and only) value as a float
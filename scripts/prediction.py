@@ -1,17 +1,30 @@
+import logging
 import streamlit as st
-import pandas as pd
-from email.message import EmailMessage
-from scripts.weather import extract_weather_features_for_hours
-from scripts.model import load_model, predict_power
+from scripts.scheduler import ensure_scheduler_started, load_latest_snapshot
+from scripts.config import get_setting
 from io import BytesIO
 import plotly.express as px
 from datetime import datetime
+import pytz
 from scripts.csv_email import send_email
+from scripts.forecast import DEFAULT_HORIZON, MAX_HORIZON
+
+logger = logging.getLogger(__name__)
 
 def plot_interactive_graphs(data):
     # Graph 1: Predicted Power (Interactive)
     fig_power = px.line(data, x='Validity', y='Predicted Power (kW)', title='Predicted Power vs Time',
                         markers=True, labels={'Predicted Power (kW)': 'Power (kW)'})
+    if {'P10 (kW)', 'P90 (kW)'}.issubset(data.columns):
+        # P10-P90 band from the historical residuals
+        fig_power.add_scatter(x=data['Validity'], y=data['P90 (kW)'], mode='lines', line=dict(width=0),
+                              showlegend=False, hoverinfo='skip')
+        fig_power.add_scatter(x=data['Validity'], y=data['P10 (kW)'], mode='lines', line=dict(width=0),
+                              fill='tonexty', fillcolor='rgba(99, 110, 250, 0.2)', name='P10 - P90')
+    if 'P50 (kW)' in data.columns:
+        # The median after the model's historical bias, next to the raw prediction
+        fig_power.add_scatter(x=data['Validity'], y=data['P50 (kW)'], mode='lines',
+                              line=dict(dash='dash'), name='P50 (bias-corrected)')
     fig_power.update_xaxes(tickangle=45)
     st.plotly_chart(fig_power, use_container_width=True)
 
@@ -34,29 +47,54 @@ def plot_interactive_graphs(data):
     else:
         st.warning("Please select at least one weather parameter to display.")
 
+def current_snapshot():
+    """Returns (latest forecast snapshot, whether it is from an earlier hour).
+
+    A stale snapshot is served as is while the background scheduler catches up; only when
+    no snapshot exists yet is one computed here. Returns (None, False) if that fails.
+    """
+    scheduler = ensure_scheduler_started()
+    snapshot = load_latest_snapshot()
+    if snapshot is None:
+        try:
+            with st.spinner("Computing the first forecast..."):
+                scheduler.refresh()
+        except Exception:
+            logger.exception("Forecast refresh failed")
+        return load_latest_snapshot(), False
+
+    current_hour = datetime.now(pytz.timezone("America/Halifax")).strftime("%Y-%m-%dT%H")
+    stale = snapshot[1]["sources"]["hour"] != current_hour
+    if stale:
+        scheduler.request_refresh()
+    return snapshot, stale
+
 def show_prediction():
-    model, expected_features = load_model()
-    features_list = extract_weather_features_for_hours()
+    # Served from the background scheduler's latest snapshot instead of recomputing per viewer
+    snapshot, stale = current_snapshot()
 
-    if not features_list:
+    if snapshot is None:
         st.error("No weather data available for predictions.")
         return
 
-    predictions = []
-    for idx, features in enumerate(features_list, start=1):
-        features_df = pd.DataFrame([features])
-        prediction = predict_power(model, expected_features, features_df)
-        predictions.append({
-            'Validity': f"{features['timehr']:02d}00 - {(features['timehr']+1)%24:02d}00",
-            'Predicted Power (kW)': round(prediction, 2),
-            **features
-        })
-
-    combined_df = pd.DataFrame(predictions)
+    combined_df, meta = snapshot
+    if stale:
+        st.warning(f"⏳ Showing the forecast from {meta['created']}; a newer one is being computed.")
+    for name, reason in meta.get("errors", {}).items():
+        st.warning(f"⚠ {name} data unavailable ({reason}); using fallback values.")
+
     combined_df = combined_df.drop(columns=['Hour'], errors='ignore')
 
+    # The snapshot holds the full horizon; show only the hours asked for
+    horizon = min(MAX_HORIZON, len(combined_df))
+    if horizon > 1:
+        horizon = st.slider("⏱️ **Forecast horizon (hours):**", min_value=1, max_value=horizon,
+                            value=min(DEFAULT_HORIZON, horizon))
+    combined_df = combined_df.head(horizon)
+
     #st.success("All predictions displayed below!")
-    st.write("### Next 4 Hour Predictions:")
+    st.write(f"### Next {horizon} Hour Predictions:")
+    st.caption(f"Forecast generated at {meta['created']}")
 
     st.data_editor(
         combined_df,
@@ -68,7 +106,7 @@ def show_prediction():
 
     # Convert DataFrame to CSV and store in memory
     csv_buffer = BytesIO()
-    filename = datetime.now().strftime("%Y-%m-%d") + "_4hr_Energy_Predictions.csv"
+    filename = datetime.now().strftime("%Y-%m-%d") + f"_{horizon}hr_Energy_Predictions.csv"
     combined_df.to_csv(csv_buffer, index=False)
     csv_buffer.seek(0)
 
@@ -76,7 +114,7 @@ def show_prediction():
     left, middle, right = st.columns(3)
     if left.button("📧 Send Email", use_container_width=True):
         csv_buffer.seek(0)
-        send_email(st.secrets["EMAIL_TO"], csv_buffer, filename)
+        send_email(get_setting("EMAIL_TO"), csv_buffer, filename)
         left.markdown("Email Sent.")
 
     if middle.download_button(label="💾 Download Locally",
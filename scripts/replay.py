@@ -0,0 +1,195 @@
+import argparse
+import bisect
+import json
+import logging
+import os
+import sys
+import threading
+import numpy as np
+import pandas as pd
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Where HTTP_MODE=record writes responses and HTTP_MODE=replay reads them (HTTP_RECORDINGS setting)
+RECORDINGS_DIR = "recordings"
+# Recording file names: UTC time of the response, sortable as text
+STAMP_FORMAT = "%Y%m%dT%H%M%S%fZ"
+
+# Recordings closer together than this belong to the same fetch cycle
+CYCLE_GAP = pd.Timedelta(minutes=1)
+
+# Feed settings the sources need to build their URLs; never contacted when replaying
+PLACEHOLDER_SETTINGS = ("BASE_URL", "LOCATION", "TOKEN", "TAF_URL", "LOC", "KEY", "API_KEY")
+
+def _utc(time):
+    """A Timestamp in UTC; naive times are taken to be UTC already."""
+    time = pd.Timestamp(time)
+    return time.tz_localize("UTC") if time.tzinfo is None else time.tz_convert("UTC")
+
+def _stamp(time):
+    return _utc(time).strftime(STAMP_FORMAT)
+
+def save_response(source, response, directory=RECORDINGS_DIR, recorded_at=None):
+    """Stores one upstream response as <directory>/<source>/<UTC timestamp>.json.
+
+    Only the status, content type and body are kept: no URL, query string or headers
+    that could carry an API key.
+    """
+    recorded_at = _utc(recorded_at) if recorded_at is not None else pd.Timestamp.now(tz="UTC")
+    source_dir = os.path.join(directory, source)
+    os.makedirs(source_dir, exist_ok=True)
+    payload = {
+        "source": source,
+        "recorded_at": recorded_at.isoformat(),
+        "status": response.status_code,
+        "content_type": response.headers.get("Content-Type"),
+        "body": response.content.decode(response.encoding or "utf-8", errors="replace"),
+    }
+    path = os.path.join(source_dir, f"{_stamp(recorded_at)}.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+    return path
+
+def _as_response(payload, url):
+    response = requests.Response()
+    response.status_code = payload["status"]
+    response._content = payload["body"].encode("utf-8")
+    response.encoding = "utf-8"
+    response.url = url
+    if payload.get("content_type"):
+        response.headers["Content-Type"] = payload["content_type"]
+    return response
+
+class Recordings:
+    """The recorded responses of a directory, indexed by source and time for bisect lookups."""
+
+    def __init__(self, directory=RECORDINGS_DIR):
+        self.directory = directory
+        self.index = {}  # source -> sorted recording stamps
+        if os.path.isdir(directory):
+            for source in sorted(os.listdir(directory)):
+                source_dir = os.path.join(directory, source)
+                if os.path.isdir(source_dir):
+                    self.index[source] = sorted(name[:-5] for name in os.listdir(source_dir) if name.endswith(".json"))
+        self._bodies = {}  # (source, stamp) -> payload, read once
+
+    def times(self, source=None):
+        """The recording times (UTC) of one source, or of every source merged, in order."""
+        stamps = self.index.get(source, []) if source else sorted({s for stamps in self.index.values() for s in stamps})
+        return pd.DatetimeIndex(pd.to_datetime(stamps, format=STAMP_FORMAT)).tz_localize("UTC")
+
+    def cycles(self, gap=CYCLE_GAP):
+        """The end of every fetch cycle: the feeds fetched together are recorded moments apart."""
+        times = self.times()
+        if not len(times):
+            return times
+        last_of_cycle = np.append(np.diff(times.asi8) > gap.value, True)
+        return times[last_of_cycle]
+
+    def lookup(self, source, at, url=None):
+        """Returns the newest recorded response of source at or before `at` as a requests.Response.
+
+        Raises requests.exceptions.ConnectionError when nothing was recorded by then, so
+        callers fall back exactly as they would for an unreachable feed.
+        """
+        stamps = self.index.get(source, [])
+        position = bisect.bisect_right(stamps, _stamp(at)) - 1
+        if position < 0:
+            raise requests.exceptions.ConnectionError(f"No recorded {source} response at or before {at}")
+        key = (source, stamps[position])
+        payload = self._bodies.get(key)
+        if payload is None:
+            with open(os.path.join(self.directory, source, f"{stamps[position]}.json")) as f:
+                payload = self._bodies[key] = json.load(f)
+        return _as_response(payload, url)
+
+# The replay clock is process-wide: fetches run on worker threads
+_clock_lock = threading.Lock()
+_clock = {"time": None}
+_recordings = {}
+
+def set_replay_time(time):
+    """Sets the moment replayed responses are served for; None serves the newest recordings."""
+    with _clock_lock:
+        _clock["time"] = _utc(time) if time is not None else None
+
+def get_recordings(directory=RECORDINGS_DIR):
+    """Returns the Recordings of directory, indexed once per process."""
+    with _clock_lock:
+        recordings = _recordings.get(directory)
+        if recordings is None:
+            recordings = _recordings[directory] = Recordings(directory)
+        return recordings
+
+def replay_response(source, url, directory=RECORDINGS_DIR):
+    """The recorded response of source for the replay clock, at full speed."""
+    at = _clock["time"]
+    if at is None:
+        at = pd.Timestamp.max.tz_localize("UTC")
+    return get_recordings(directory).lookup(source, at, url)
+
+def replay_forecasts(directory, horizon, start=None, end=None):
+    """Runs the forecast pipeline once per recorded fetch cycle between start and end.
+
+    Each step serves the responses recorded up to the end of its cycle, with the forecast
+    clock set to that time, so the same recordings always give the same forecasts.
+    Yields (time, forecast DataFrame) pairs.
+    """
+    from scripts.cache import source_cache
+    from scripts.forecast import run_forecast
+    from scripts.sources import fetch_sources_concurrently
+
+    os.environ["HTTP_MODE"] = "replay"
+    os.environ["HTTP_RECORDINGS"] = directory
+    for name in PLACEHOLDER_SETTINGS:
+        os.environ.setdefault(name, "replay")
+    times = get_recordings(directory).cycles()
+    if start is not None:
+        times = times[times >= _utc(start)]
+    if end is not None:
+        times = times[times < _utc(end)]
+
+    for time in times:
+        set_replay_time(time)
+        source_cache.invalidate()  # Every step sees the recordings of its own time, not a cached earlier one
+        # Feeds missing at this time take their usual fallbacks (and are logged by the feature builders)
+        sources = fetch_sources_concurrently()
+        yield time, run_forecast(horizon, sources=sources, current_time=time.tz_convert("America/Halifax"))
+    set_replay_time(None)
+
+def main(argv=None):
+    # Run as `python -m scripts.replay` this file is __main__; the replay clock that
+    # http_client reads lives in the imported scripts.replay module
+    from scripts import replay
+    from scripts.forecast import MAX_HORIZON
+    from scripts.writers import ResultWriter
+
+    parser = argparse.ArgumentParser(description="Replay recorded upstream responses through the forecast pipeline.")
+    parser.add_argument("--recordings", default=RECORDINGS_DIR, help="Directory written with HTTP_MODE=record")
+    parser.add_argument("--start", default=None, help="First UTC time to replay, e.g. 2025-06-21")
+    parser.add_argument("--end", default=None, help="End of the replay (exclusive, UTC)")
+    parser.add_argument("--horizon", type=int, default=MAX_HORIZON)
+    parser.add_argument("--out", required=True, help="Output .csv or .parquet file with every replayed forecast")
+    args = parser.parse_args(argv)
+    if not 1 <= args.horizon <= MAX_HORIZON:
+        parser.error(f"--horizon must be between 1 and {MAX_HORIZON}")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    writer = ResultWriter(args.out)
+    steps = 0
+    try:
+        for time, df in replay.replay_forecasts(args.recordings, args.horizon, args.start, args.end):
+            if not df.empty:
+                df.insert(0, "Replay Time", time.isoformat())
+                writer.write(df)
+            steps += 1
+    finally:
+        writer.close()
+    logger.info(f"Replayed {steps} recorded fetch cycles into {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
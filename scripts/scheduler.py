@@ -0,0 +1,172 @@
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+import pandas as pd
+import pytz
+from scripts import metrics
+from scripts.forecast import MAX_HORIZON, IncrementalForecast
+from scripts.sources import fetch_sources_concurrently, source_versions
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = "snapshots"
+LATEST_SNAPSHOT = "latest.json"
+KEEP_SNAPSHOTS = 48
+
+# How often the scheduler checks the (cached) feeds for a new upstream issue
+POLL_INTERVAL = 60
+# Early refreshes asked for by readers of a stale snapshot start at most this often (seconds)
+CATCH_UP_INTERVAL = 15
+
+def _write_json_atomic(path, payload):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)  # Readers see either the old or the new file, never a partial one
+
+def write_snapshot(df, meta, snapshot_dir=SNAPSHOT_DIR):
+    """Persists a forecast as a versioned snapshot and points latest.json at it."""
+    os.makedirs(snapshot_dir, exist_ok=True)
+    payload = {**meta, "rows": json.loads(df.to_json(orient="records"))}
+    _write_json_atomic(os.path.join(snapshot_dir, f"forecast_{meta['version']}.json"), payload)
+    _write_json_atomic(os.path.join(snapshot_dir, LATEST_SNAPSHOT), payload)
+
+    # Keep a bounded history of versioned snapshots
+    history = sorted(name for name in os.listdir(snapshot_dir)
+                     if name.startswith("forecast_") and name.endswith(".json"))
+    for name in history[:-KEEP_SNAPSHOTS]:
+        os.remove(os.path.join(snapshot_dir, name))
+
+_latest_lock = threading.Lock()
+_latest = {"mtime": None, "snapshot": None}
+
+def load_latest_snapshot(snapshot_dir=SNAPSHOT_DIR):
+    """Returns (forecast DataFrame, metadata) of the newest snapshot, or None if there is none.
+
+    The file is parsed only when it changes, so repeated page renders cost a stat() call.
+    """
+    path = os.path.join(snapshot_dir, LATEST_SNAPSHOT)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    with _latest_lock:
+        if _latest["mtime"] != (path, mtime):
+            with open(path) as f:
+                payload = json.load(f)
+            rows = payload.pop("rows")
+            _latest["snapshot"] = (pd.DataFrame(rows), payload)
+            _latest["mtime"] = (path, mtime)
+        return _latest["snapshot"]
+
+class ForecastScheduler:
+    """Recomputes the rolling forecast once per upstream update and publishes it as a snapshot.
+
+    The snapshot covers the full horizon; readers show as many hours as they need.
+    """
+
+    def __init__(self, horizon=MAX_HORIZON, interval=POLL_INTERVAL, snapshot_dir=SNAPSHOT_DIR):
+        self.horizon = horizon
+        self.interval = interval
+        self.snapshot_dir = snapshot_dir
+        self._refresh_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._last_attempt = float("-inf")
+        self._thread = None
+        self._forecast = IncrementalForecast(horizon)
+
+    def refresh(self, force=False):
+        """Publishes a new snapshot if the forecast hour or any upstream issue changed.
+
+        Returns the snapshot metadata, whether it was newly computed or already current.
+        """
+        with self._refresh_lock:
+            self._last_attempt = time.monotonic()
+            sources = fetch_sources_concurrently()
+            taf_data, metar_data, cloud_data, errors = sources
+            now = datetime.now(pytz.timezone("America/Halifax"))
+            versions = {"hour": now.strftime("%Y-%m-%dT%H"), **source_versions(taf_data, metar_data, cloud_data)}
+
+            latest = load_latest_snapshot(self.snapshot_dir)
+            if not force and latest is not None and latest[1].get("sources") == versions:
+                return latest[1]
+
+            # Only the hours whose features changed since the previous run are re-scored
+            with metrics.timed("forecast_update"):
+                df, diff, rescored = self._forecast.update(sources, now, versions)
+            if df.empty:
+                logger.warning("No weather data available; keeping the previous snapshot.")
+                return latest[1] if latest is not None else None
+
+            meta = {
+                "version": now.strftime("%Y%m%dT%H%M%S"),
+                "created": now.isoformat(),
+                "horizon": self.horizon,
+                "sources": versions,
+                "errors": errors,
+                "rescored": rescored,
+                "changes": diff.astype(object).where(diff.notna(), None).to_dict(orient="records"),
+            }
+            write_snapshot(df, meta, self.snapshot_dir)
+            logger.info(f"Published forecast snapshot {meta['version']} ({versions}); "
+                        f"{rescored} of {len(df)} hours re-scored, {len(diff)} changed")
+            metrics.log_snapshot()  # One JSON line per published snapshot
+            return meta
+
+    def request_refresh(self):
+        """Asks the background thread to refresh now instead of at its next poll; never blocks.
+
+        Requests within CATCH_UP_INTERVAL of the last attempt are ignored, so every viewer of
+        a stale snapshot does not trigger a fetch of their own.
+        """
+        if time.monotonic() - self._last_attempt >= CATCH_UP_INTERVAL:
+            self._wake.set()
+
+    def run_forever(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Forecast refresh failed")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def start(self):
+        """Starts the background refresh thread (once)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run_forever, name="forecast-scheduler", daemon=True)
+            self._thread.start()
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def ensure_scheduler_started():
+    """Returns the process-wide scheduler, starting its background thread on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = ForecastScheduler()
+            _scheduler.start()
+    return _scheduler
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep the rolling forecast snapshot up to date.")
+    parser.add_argument("--once", action="store_true", help="Refresh once and exit (e.g. from cron)")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="Seconds between checks")
+    parser.add_argument("--horizon", type=int, default=MAX_HORIZON)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    scheduler = ForecastScheduler(horizon=args.horizon, interval=args.interval)
+    if args.once:
+        scheduler.refresh()
+    else:
+        scheduler.run_forever()
+
+if __name__ == "__main__":
+    main()
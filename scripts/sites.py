@@ -0,0 +1,215 @@
+import argparse
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pytz
+from scripts.forecast import MAX_HORIZON
+from scripts.model import load_model, predict_power_batch
+from scripts.solar_geometry import LATITUDE, LONGITUDE, clock_hours, solar_params
+from scripts.solar_table import SOLAR_COLUMNS
+from scripts.sources import fetch_hrrr_points, fetch_sources_concurrently
+from scripts.weather import extract_weather_features_frame
+from scripts.writers import ResultWriter, read_chunks
+
+logger = logging.getLogger(__name__)
+
+# The model was trained on the Slemon Park array; other sites scale its output by capacity
+REFERENCE_CAPACITY_KW = 12500
+
+# Built-in PEI sites: (latitude, longitude, capacity in kW). More can be loaded with load_sites().
+SITES = {
+    "Slemon Park": (46.4392, -63.8413, 12500),
+    "Brackley": (46.3050, -63.1460, 1000),
+    "Rustico": (46.4500, -63.3000, 1000),
+    "New Glasgow": (46.4108, -63.3483, 1000),
+    "Crapaud": (46.2372, -63.5111, 1000),
+}
+
+def load_sites(path):
+    """Reads a site table (site, latitude, longitude, capacity_kw) into the SITES layout."""
+    df = pd.read_csv(path, dtype={"site": str, "latitude": float, "longitude": float, "capacity_kw": float})
+    return {row.site: (row.latitude, row.longitude, row.capacity_kw) for row in df.itertuples(index=False)}
+
+def capacity_table(sites=None):
+    """The site capacities as a table (site, capacity_kw, effective_from) for scale_to_sites."""
+    sites = sites or SITES
+    return pd.DataFrame({
+        "site": list(sites),
+        "capacity_kw": [float(capacity) for _, _, capacity in sites.values()],
+        "effective_from": pd.NaT,
+    })
+
+def load_capacity_table(path):
+    """Reads site, capacity_kw and an optional effective_from date (for capacity changes over time)."""
+    df = pd.read_csv(path, dtype={"site": str, "capacity_kw": float})
+    df["effective_from"] = pd.to_datetime(df["effective_from"]) if "effective_from" in df.columns else pd.NaT
+    return df[["site", "capacity_kw", "effective_from"]]
+
+def scale_to_sites(power, capacities, timestamps=None, reference_kw=REFERENCE_CAPACITY_KW):
+    """Scales the reference array's predicted power to every site of a capacity table at once.
+
+    The model predicts for the trained array, so power is always divided by reference_kw;
+    a Slemon Park row in the table is an output site like any other.
+
+    A site may have several rows with different effective_from dates; given timestamps,
+    each row uses the capacity in effect at that time (0 before the first one), otherwise
+    the latest. Returns one 'Predicted Power in <site> (kW)' column per site.
+    """
+    share = np.asarray(power, dtype=float) / reference_kw
+    sites = capacities["site"].drop_duplicates().tolist()
+    capacity = np.empty((len(share), len(sites)))
+
+    for j, site in enumerate(sites):
+        rows = capacities[capacities["site"] == site]
+        starts = pd.DatetimeIndex(rows["effective_from"]).fillna(pd.Timestamp.min)
+        order = np.argsort(starts.asi8, kind="stable")
+        values = rows["capacity_kw"].to_numpy(dtype=float)[order]
+        if timestamps is None:
+            capacity[:, j] = values[-1]
+        else:
+            pos = np.searchsorted(starts.asi8[order], pd.DatetimeIndex(timestamps).asi8, side="right") - 1
+            capacity[:, j] = np.where(pos >= 0, values[np.clip(pos, 0, None)], 0.0)
+
+    return pd.DataFrame(share[:, None] * capacity, columns=[f"Predicted Power in {site} (kW)" for site in sites])
+
+# Power columns written by the prediction page and by the backfill, respectively
+POWER_COLUMNS = ["Predicted Power (kW)", "Predicted Values"]
+
+def scale_file(source, name, out, capacities, reference_kw=REFERENCE_CAPACITY_KW,
+               drop_columns=(), chunk_rows=50_000, preview_rows=1000):
+    """Streams a prediction file through scale_to_sites into out (.csv or .parquet) chunk by chunk.
+
+    Only one chunk of chunk_rows rows (plus the preview) is held at a time, so a file on
+    disk is scaled in bounded memory; an in-memory source is of course already whole.
+    Columns in drop_columns are never parsed; the power column is read as float64 and
+    Timestamp/Validity as strings. Returns (rows written, the first preview_rows rows),
+    or raises ValueError if the file has no power column.
+    """
+    drop_columns = set(drop_columns)
+    dtype = {column: "float64" for column in POWER_COLUMNS}
+    dtype.update({"Timestamp": "string", "Validity": "string"})
+
+    writer = ResultWriter(out)
+    rows, preview = 0, []
+    try:
+        for chunk in read_chunks(source, name, chunk_rows, columns=lambda c: c not in drop_columns, dtype=dtype):
+            power_column = next((col for col in POWER_COLUMNS if col in chunk.columns), None)
+            if power_column is None:
+                raise ValueError("The uploaded file does not contain the required 'Predicted Power (kW)' column.")
+
+            timestamps = pd.to_datetime(chunk["Timestamp"]) if "Timestamp" in chunk.columns else None
+            sites_df = scale_to_sites(chunk[power_column], capacities, timestamps, reference_kw)
+            chunk = pd.concat([chunk.reset_index(drop=True), sites_df], axis=1)
+
+            writer.write(chunk)
+            if rows < preview_rows:
+                preview.append(chunk.head(preview_rows - rows))
+            rows += len(chunk)
+    finally:
+        writer.close()
+    return rows, (pd.concat(preview, ignore_index=True) if preview else pd.DataFrame())
+
+def _init_worker():
+    # With fork the parent's booster is inherited copy-on-write and this is a no-op;
+    # with spawn each worker unpickles it once instead of once per task
+    load_model()
+
+_pool = {"workers": None, "executor": None}
+
+def _get_pool(workers):
+    """Returns the process pool shared by every run, (re)created when the size changes."""
+    if _pool["workers"] != workers:
+        if _pool["executor"] is not None:
+            _pool["executor"].shutdown(wait=False)
+        load_model()  # Load before forking so workers share the parent's copy
+        _pool["executor"] = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        _pool["workers"] = workers
+    return _pool["executor"]
+
+def score_site(name, site, sources, current_time, horizon, scenarios):
+    """Builds one site's feature matrix and scores it under every scenario (one worker task).
+
+    The weather comes from the shared METAR/TAF plus the site's own HRRR grid point; the
+    solar geometry comes from the solar table at the reference array and is recomputed for
+    any other coordinates. Returns a long DataFrame.
+    """
+    lat, lon, capacity = site
+    features_df = extract_weather_features_frame(horizon, on_source_error=lambda *args: None,
+                                                 sources=sources, current_time=current_time)
+    if features_df.empty:
+        return pd.DataFrame()
+
+    if (lat, lon) != (LATITUDE, LONGITUDE):
+        times = pd.date_range(current_time, periods=horizon, freq="h")
+        features_df[SOLAR_COLUMNS] = solar_params(clock_hours(times), lat, lon).to_numpy()
+
+    model, expected_features = load_model()
+    frames = []
+    for scenario, overrides in scenarios.items():
+        scenario_df = features_df.assign(**overrides) if overrides else features_df
+        predictions = predict_power_batch(model, expected_features, scenario_df)
+        frames.append(pd.DataFrame({
+            'Site': name,
+            'Scenario': scenario,
+            'Validity': [f"{hr:02d}00 - {(hr+1)%24:02d}00" for hr in features_df['timehr']],
+            'Predicted Power (kW)': (predictions * capacity / REFERENCE_CAPACITY_KW).astype(float).round(2),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+def run_sites(sites=None, horizon=MAX_HORIZON, scenarios=None, workers=None, current_time=None):
+    """Forecasts every site (and scenario) in parallel across a process pool.
+
+    scenarios maps a scenario name to feature overrides, e.g. {"overcast": {"low_cloud_coverage": 100}};
+    the default is the plain forecast. Returns (long DataFrame, per-site HRRR errors).
+    """
+    sites = sites or SITES
+    scenarios = scenarios or {"forecast": {}}
+    if current_time is None:
+        current_time = datetime.now(pytz.timezone("America/Halifax"))
+
+    taf_data, metar_data, _, errors = fetch_sources_concurrently()
+    clouds, site_errors = fetch_hrrr_points({name: (lat, lon) for name, (lat, lon, _) in sites.items()})
+    for name, reason in errors.items():
+        if name != "HRRR":
+            logger.warning(f"{name} data unavailable ({reason}); using fallback values.")
+
+    tasks = [(name, site, (taf_data, metar_data, clouds[name], {}), current_time, horizon, scenarios)
+             for name, site in sites.items()]
+    workers = workers or min(len(tasks), os.cpu_count() or 1)
+    if workers <= 1:
+        results = [score_site(*task) for task in tasks]
+    else:
+        pool = _get_pool(workers)
+        results = [future.result() for future in [pool.submit(score_site, *task) for task in tasks]]
+
+    results = [df for df in results if not df.empty]
+    return (pd.concat(results, ignore_index=True) if results else pd.DataFrame()), site_errors
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forecast many solar sites in parallel.")
+    parser.add_argument("--sites", help="CSV with site, latitude, longitude, capacity_kw (default: built-in PEI sites)")
+    parser.add_argument("--horizon", type=int, default=MAX_HORIZON)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per site, up to all cores)")
+    parser.add_argument("--out", default=None, help="Output CSV; prints to stdout if omitted")
+    args = parser.parse_args(argv)
+    if not 1 <= args.horizon <= MAX_HORIZON:
+        parser.error(f"--horizon must be between 1 and {MAX_HORIZON}")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    sites = load_sites(args.sites) if args.sites else None
+    df, errors = run_sites(sites, args.horizon, workers=args.workers)
+    for name, reason in errors.items():
+        logger.warning(f"HRRR data unavailable for {name} ({reason}); using TAF/METAR only.")
+    if df.empty:
+        logger.error("No weather data available for predictions.")
+        return 1
+
+    df.to_csv(args.out or sys.stdout, index=False)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
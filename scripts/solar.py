@@ -2,14 +2,15 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import datetime
+from scripts.downsample import get_multi_resolution
+from scripts.solar_table import get_solar_table
 
 def visualize_csv(file_name):
     try:
-        # Load CSV
-        df = pd.read_csv(file_name)
-
-        # Convert 'timestamp' to datetime
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
+        # Load the shared, pre-indexed solar table (parsed once per process) and its aggregates
+        table = get_solar_table(file_name)
+        df = table.frame
+        store = get_multi_resolution(table, df)
 
         # Sidebar: Select Time Range
         time_range = st.sidebar.selectbox("Select Time Range", 
@@ -59,24 +60,21 @@ def visualize_csv(file_name):
             title_text = f"Data shown for {selected_period}"
 
         elif time_range == "Quarterly":
-            df["quarter"] = df["timestamp"].dt.to_period("Q").astype(str)
-            quarters = df["quarter"].unique()
+            quarters = pd.unique(store.period_labels("Q"))
             selected_period = st.sidebar.selectbox("Select Quarter", quarters)
             start_date = pd.to_datetime(selected_period[:4] + "-" + str((int(selected_period[-1]) - 1) * 3 + 1))
             end_date = start_date + pd.DateOffset(months=3)
             title_text = f"Data shown for Quarter {selected_period[-1]}, {selected_period[:4]}"
 
         elif time_range == "6 Months":
-            df["half_year"] = df["timestamp"].dt.to_period("2Q").astype(str)
-            half_years = df["half_year"].unique()
+            half_years = pd.unique(store.period_labels("2Q"))
             selected_period = st.sidebar.selectbox("Select 6-Month Period", half_years)
             start_date = pd.to_datetime(selected_period[:4] + "-01") if "Q1" in selected_period else pd.to_datetime(selected_period[:4] + "-07")
             end_date = start_date + pd.DateOffset(months=6)
             title_text = f"Data shown for 6-Month Period {selected_period[:4]} ({'Jan-Jun' if 'Q1' in selected_period else 'Jul-Dec'})"
 
         elif time_range == "9 Months":
-            df["three_quarters"] = df["timestamp"].dt.to_period("3Q").astype(str)
-            three_quarters = df["three_quarters"].unique()
+            three_quarters = pd.unique(store.period_labels("3Q"))
             selected_period = st.sidebar.selectbox("Select 9-Month Period", three_quarters)
             start_date = pd.to_datetime(selected_period[:4] + "-01")
             end_date = start_date + pd.DateOffset(months=9)
@@ -89,9 +87,6 @@ def visualize_csv(file_name):
             end_date = start_date + pd.DateOffset(years=1)
             title_text = f"Data shown for {selected_period}"
 
-        # Filter Data Based on Selected Period
-        df_filtered = df[(df["timestamp"] >= start_date) & (df["timestamp"] < end_date)]
-
         # Session State for Toggle Button
         if "view_mode" not in st.session_state:
             st.session_state.view_mode = "Graph"
@@ -115,11 +110,22 @@ def visualize_csv(file_name):
 
             secondary_y_label = "Degree" if secondary_y else None
 
+            # Bounded number of points per trace: raw/LTTB hours for short ranges, daily or weekly min-mean-max beyond
+            df_filtered, resolution = store.series(start_date, end_date, selected_y_axes)
+
             fig = go.Figure()
-            for col in primary_y:
-                fig.add_trace(go.Scatter(x=df_filtered["timestamp"], y=df_filtered[col], mode='lines', name=col, yaxis="y1"))
-            for col in secondary_y:
-                fig.add_trace(go.Scatter(x=df_filtered["timestamp"], y=df_filtered[col], mode='lines', name=col, yaxis="y2"))
+            for col in selected_y_axes:
+                yaxis = "y1" if col in primary_y else "y2"
+                if resolution == "hourly":
+                    fig.add_trace(go.Scatter(x=df_filtered["timestamp"], y=df_filtered[col], mode='lines', name=col, yaxis=yaxis))
+                    continue
+                # Min-max band behind the mean
+                fig.add_trace(go.Scatter(x=df_filtered["timestamp"], y=df_filtered[(col, "max")], mode='lines',
+                                         line=dict(width=0), showlegend=False, hoverinfo="skip", yaxis=yaxis))
+                fig.add_trace(go.Scatter(x=df_filtered["timestamp"], y=df_filtered[(col, "min")], mode='lines',
+                                         line=dict(width=0), fill='tonexty', opacity=0.3, name=f"{col} (min-max)", yaxis=yaxis))
+                fig.add_trace(go.Scatter(x=df_filtered["timestamp"], y=df_filtered[(col, "mean")], mode='lines',
+                                         name=f"{col} ({resolution} mean)", yaxis=yaxis))
 
             fig.update_layout(
                 xaxis=dict(title="Time Stamp"),
@@ -0,0 +1,128 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from scripts.solar_table import SOLAR_COLUMNS
+
+# Slemon Park, Summerside, PE (same point as the HRRR request in cloud.py)
+LATITUDE = 46.4392
+LONGITUDE = -63.8413
+TIMEZONE = "America/Halifax"
+
+# Reference meridian for local solar time. csv/solar_2025.csv, which the model was
+# trained on, was generated against -75° rather than Atlantic's -60°, so keep it.
+STANDARD_MERIDIAN = -75.0
+
+# Power-law fit of tmaxGHI against the sine of the sun's elevation at the end of
+# the local clock hour, least-squares fitted on csv/solar_2025.csv. The CSV's tmaxGHI is
+# empirical and varies day to day (24 vs 100 Wh/m² at 07:00 on Jan 1 and 2), which no
+# geometry reproduces: over 2025 the fit is off by RMSE ≈ 51 and at most 322 Wh/m², and
+# 201 hours (mostly around sunrise and sunset) disagree on whether it is above 0. The
+# CSV stays authoritative; this only fills the hours it does not cover.
+GHI_SCALE = 1257.9
+GHI_EXPONENT = 0.51
+
+def _wall_clock(times):
+    """Returns timestamps as naive local wall-clock times (the convention of the solar CSV)."""
+    times = pd.DatetimeIndex(times)
+    if times.tz is not None:
+        times = times.tz_localize(None)
+    return times
+
+def clock_hours(times):
+    """Floors timestamps to the start of their local clock hour, the row a time falls in in the solar CSV."""
+    return _wall_clock(times).floor("h")
+
+def _declination_and_hour_angle(times, lon, meridian):
+    """Cooper declination and hour angle (degrees) for naive local timestamps."""
+    day = times.dayofyear.to_numpy()
+    hours = times.hour.to_numpy() + times.minute.to_numpy() / 60.0
+
+    declination = 23.45 * np.sin(np.radians(360.0 * (284 + day) / 365.0))
+
+    # Equation of time in minutes
+    b = np.radians(360.0 / 364.0 * (day - 81))
+    eot = 9.87 * np.sin(2 * b) - 7.53 * np.cos(b) - 1.5 * np.sin(b)
+
+    solar_time = hours + (4.0 * (lon - meridian) + eot) / 60.0
+    return declination, 15.0 * (solar_time - 12.0)
+
+def _elevation(lat, declination, hour_angle):
+    lat, dec, ha = np.radians(lat), np.radians(declination), np.radians(hour_angle)
+    return np.degrees(np.arcsin(np.sin(lat) * np.sin(dec) + np.cos(lat) * np.cos(dec) * np.cos(ha)))
+
+def solar_position(times, lat=LATITUDE, lon=LONGITUDE, meridian=STANDARD_MERIDIAN):
+    """Computes elevation, azimuth, declination and hour angle (degrees) for an array of timestamps.
+
+    Azimuth is measured from south, positive towards the east, wrapped to [0, 360).
+    """
+    times = _wall_clock(times)
+    declination, hour_angle = _declination_and_hour_angle(times, lon, meridian)
+    elevation = _elevation(lat, declination, hour_angle)
+
+    lat_r, dec_r, ha_r = np.radians(lat), np.radians(declination), np.radians(hour_angle)
+    azimuth = np.degrees(np.arctan2(-np.sin(ha_r),
+                                    np.sin(lat_r) - np.cos(lat_r) * np.tan(dec_r) * np.cos(ha_r))) % 360.0
+
+    return pd.DataFrame({
+        "solar_elevationdegrees": elevation,
+        "solar_azimuthdegrees": azimuth,
+        "solar_declinationdegrees": declination,
+        "hour_angledegrees": hour_angle,
+    })
+
+def _dst_hours(times, tz):
+    """Daylight-saving offset in hours (0 or 1) for naive local timestamps."""
+    local = times.tz_localize(tz, ambiguous=False, nonexistent="shift_forward")
+    offsets = (local.tz_localize(None) - local.tz_convert("UTC").tz_localize(None)) / pd.Timedelta(hours=1)
+    offsets = offsets.to_numpy()
+    return offsets - offsets.min() if len(offsets) else offsets
+
+def clear_sky_ghi(times, lat=LATITUDE, lon=LONGITUDE, tz=TIMEZONE):
+    """Estimates tmaxGHI (Wh/m²) for an array of timestamps; 0 when the sun is down."""
+    times = _wall_clock(times)
+
+    # The fit uses the sun at the end of the clock hour, in local standard time
+    dst = _dst_hours(times, tz) if tz is not None else np.zeros(len(times))
+    times = times + pd.to_timedelta(1.0 - dst, unit="h")
+    meridian = -15.0 * round(-lon / 15.0)
+
+    declination, hour_angle = _declination_and_hour_angle(times, lon, meridian)
+    sin_elevation = np.sin(np.radians(_elevation(lat, declination, hour_angle)))
+    return np.where(sin_elevation > 0, GHI_SCALE * np.clip(sin_elevation, 0, None) ** GHI_EXPONENT, 0.0)
+
+def solar_params(times, lat=LATITUDE, lon=LONGITUDE, tz=TIMEZONE):
+    """Returns the five solar feature columns used by the model, one row per timestamp."""
+    params = solar_position(times, lat, lon)
+    params["tmaxGHI"] = clear_sky_ghi(times, lat, lon, tz)
+    return params[SOLAR_COLUMNS]
+
+def generate_solar_table(year, lat=LATITUDE, lon=LONGITUDE, tz=TIMEZONE):
+    """Builds an hourly solar table for a whole year in the layout of csv/solar_2025.csv.
+
+    The geometry columns match the CSV to 0.02°; tmaxGHI is the analytic fit above, an
+    approximation of the CSV's empirical values.
+    """
+    timestamps = pd.date_range(f"{year}-01-01", f"{year + 1}-01-01", freq="h", inclusive="left")
+    table = solar_params(timestamps, lat, lon, tz).round(2)
+    table.insert(0, "timestamp", timestamps.strftime("%Y-%m-%d %H:%M"))
+    return table
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate an hourly solar parameter CSV for a given year.")
+    parser.add_argument("--year", type=int, required=True)
+    parser.add_argument("--lat", type=float, default=LATITUDE)
+    parser.add_argument("--lon", type=float, default=LONGITUDE)
+    parser.add_argument("--out", default=None, help="Output CSV (default: csv/solar_<year>.csv)")
+    parser.add_argument("--force", action="store_true", help="Overwrite an existing CSV")
+    args = parser.parse_args()
+
+    out = args.out or f"csv/solar_{args.year}.csv"
+    if os.path.exists(out) and not args.force:
+        # e.g. csv/solar_2025.csv holds the empirical tmaxGHI the model was trained on
+        parser.error(f"{out} exists; pass --force to replace it with the analytic approximation")
+    generate_solar_table(args.year, args.lat, args.lon).to_csv(out, index=False)
+    print(f"Wrote {out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from scripts.table_cache import load_arrays
+
+SOLAR_CSV = "csv/solar_2025.csv"
+SOLAR_COLUMNS = ["solar_elevationdegrees", "solar_azimuthdegrees", "solar_declinationdegrees",
+                 "hour_angledegrees", "tmaxGHI"]
+
+_HOUR_NS = 3_600_000_000_000
+
+class SolarTable:
+    """Hourly solar parameters indexed by wall-clock timestamp for constant-time lookups."""
+
+    def __init__(self, index, values):
+        index = pd.DatetimeIndex(index)
+        if not index.is_monotonic_increasing:
+            order = np.argsort(index.asi8, kind="stable")
+            index, values = index[order], np.asarray(values)[order]
+        self.index = index
+        self.values = values if values.flags.c_contiguous and values.dtype == np.float64 else \
+            np.ascontiguousarray(values, dtype=np.float64)
+        self._frame = None
+
+        # An evenly spaced hourly table can be addressed by hour offset alone
+        stamps = self.index.asi8
+        self._start = stamps[0] if len(stamps) else 0
+        self._contiguous = bool(len(stamps)) and bool(np.all(np.diff(stamps) == _HOUR_NS))
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(df["timestamp"], df[SOLAR_COLUMNS].to_numpy(dtype=np.float64))
+
+    @classmethod
+    def from_csv(cls, path=SOLAR_CSV):
+        """Loads the table from its memory-mapped binary cache, rebuilt from the CSV when it changes."""
+        index, values, columns = load_arrays(path, "timestamp")
+        if columns != SOLAR_COLUMNS:
+            values = values[:, [columns.index(column) for column in SOLAR_COLUMNS]]
+        return cls(index, values)
+
+    @property
+    def frame(self):
+        """The table as a DataFrame (timestamp plus the solar columns), built on first use."""
+        if self._frame is None:
+            frame = pd.DataFrame(np.asarray(self.values), columns=SOLAR_COLUMNS)
+            frame.insert(0, "timestamp", self.index)
+            self._frame = frame
+        return self._frame
+
+    def positions(self, times):
+        """Returns row positions for each timestamp's hour, or -1 where the table has no entry."""
+        keys = _hour_keys(times)
+        if self._contiguous:
+            pos = (keys - self._start) // _HOUR_NS
+            pos[(pos < 0) | (pos >= len(self.values))] = -1
+            return pos
+        return self.index.get_indexer(pd.DatetimeIndex(keys))
+
+    def lookup(self, times):
+        """Returns an (n, 5) array of solar parameters; hours missing from the table are 0.0."""
+        pos = self.positions(times)
+        out = np.zeros((len(pos), len(SOLAR_COLUMNS)))
+        hit = pos >= 0
+        out[hit] = self.values[pos[hit]]
+        return out
+
+def _hour_keys(times):
+    """Floors timestamps to the hour on the local wall clock, as int64 nanoseconds."""
+    times = pd.DatetimeIndex(times)
+    if times.tz is not None:
+        times = times.tz_localize(None)  # Keep local wall-clock time, as the CSV does
+    return times.floor("h").asi8.copy()
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+def get_solar_table(path=SOLAR_CSV):
+    """Returns the process-wide SolarTable for path, reloading it only when the CSV changes."""
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    entry = _tables.get(path)
+    if entry is None or entry[0] != signature:
+        with _tables_lock:
+            entry = _tables.get(path)
+            if entry is None or entry[0] != signature:
+                entry = (signature, SolarTable.from_csv(path))
+                _tables[path] = entry
+    return entry[1]
@@ -0,0 +1,146 @@
+# UI-free access to the upstream feeds. Every request_* function raises on failure;
+# the Streamlit pages wrap them with their own error messages.
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from io import StringIO
+import pandas as pd
+from scripts import http_client, metrics
+from scripts.cache import cached_source
+from scripts.config import get_setting
+
+# SpotWX endpoint (overridable with the HRRR_URL setting) and the HRRR grid point (Slemon Park, Summerside, PE)
+HRRR_URL = "https://spotwx.io/api.php"
+HRRR_LAT = 46.4392
+HRRR_LON = -63.8413
+
+# METAR is issued hourly; refresh well within the hour so a new report shows up promptly
+METAR_TTL = 15 * 60
+# TAFs are issued every 6 hours and amended in between; an hourly refresh catches amendments
+TAF_TTL = 60 * 60
+# HRRR runs hourly; refresh twice per run cycle
+HRRR_TTL = 30 * 60
+
+# Per-source time budgets (seconds) for fetch_sources_concurrently; callers waiting on
+# another caller's fetch of the same source give up after the same budget
+SOURCE_TIMEOUTS = {"TAF": 10.0, "METAR": 10.0, "HRRR": 15.0}
+
+@cached_source("metar", ttl=METAR_TTL, wait_timeout=SOURCE_TIMEOUTS["METAR"])
+@metrics.timed("fetch_metar")  # Inside the cache: only real upstream fetches are timed
+def request_metar_data():
+    """Requests raw METAR JSON from the API, raising on failure. Shared by every page."""
+    url = f"{get_setting('BASE_URL')}/{get_setting('LOCATION')}?token={get_setting('TOKEN')}&format=json"
+    response = http_client.get(url, source="metar")
+    response.raise_for_status()
+    return response.json()
+
+@cached_source("taf", ttl=TAF_TTL, wait_timeout=SOURCE_TIMEOUTS["TAF"])
+@metrics.timed("fetch_taf")
+def request_taf_data():
+    """Requests the decoded TAF JSON from the CheckWX API, raising on failure."""
+    url = f"{get_setting('TAF_URL')}/{get_setting('LOC')}/decoded"
+    headers = {"X-API-Key": get_setting("KEY")}
+    response = http_client.get(url, headers=headers, source="taf")
+    response.raise_for_status()
+    return response.json()
+
+def first_taf_report(data):
+    """Returns the first decoded TAF report in a CheckWX response, or None if there is none."""
+    if 'data' in data and data['data']:
+        return data['data'][0]
+    return None
+
+@cached_source("hrrr", ttl=HRRR_TTL, wait_timeout=SOURCE_TIMEOUTS["HRRR"])
+@metrics.timed("fetch_hrrr")
+def request_cloud_data(lat=HRRR_LAT, lon=HRRR_LON):
+    """Requests the HRRR forecast CSV from SpotWX as a DataFrame, raising on failure.
+
+    The returned DataFrame is shared through the cache and must not be modified in place.
+    """
+    params = {
+        "key": get_setting("API_KEY"),
+        "lat": lat,
+        "lon": lon,
+        "model": "hrrr"
+    }
+
+    # Other grid points (e.g. the sites) are recorded separately from the default one
+    source = "hrrr" if (lat, lon) == (HRRR_LAT, HRRR_LON) else f"hrrr_{lat:.4f}_{lon:.4f}"
+    response = http_client.get(get_setting("HRRR_URL", HRRR_URL), params=params, source=source)
+    response.raise_for_status()  # Raise an error for bad responses (4xx, 5xx)
+
+    if not response.text.strip():
+        raise ValueError("API returned an empty response.")
+
+    # Convert CSV response to DataFrame, parsing and sorting the model steps once per fetch
+    df = pd.read_csv(StringIO(response.text))
+    return prepare_hrrr_frame(df)
+
+def prepare_hrrr_frame(df):
+    """Adds a tz-aware VALID_TIME (PEI time) column parsed from the UTC DATETIME and sorts by it."""
+    if 'DATETIME' not in df.columns:
+        return df
+    valid_time = pd.to_datetime(df['DATETIME'], errors='coerce').dt.tz_localize('UTC').dt.tz_convert('America/Halifax')
+    return df.assign(VALID_TIME=valid_time).sort_values('VALID_TIME', kind='stable', ignore_index=True)
+
+
+# Shared by all sessions; a request that outlives its budget keeps running and warms the cache
+_fetch_pool = ThreadPoolExecutor(max_workers=6, thread_name_prefix="weather-fetch")
+
+@metrics.timed("fetch_sources")
+def fetch_sources_concurrently():
+    """Fetches TAF, METAR and HRRR in parallel, each within its own time budget.
+
+    Returns (taf_data, metar_data, cloud_data, errors). A source that fails or runs
+    out of time is replaced by its usual fallback (None, {} or an empty DataFrame)
+    and its reason is recorded in errors, so one slow feed never blocks the others.
+    """
+    start = time.monotonic()
+    futures = {
+        "TAF": _fetch_pool.submit(request_taf_data),
+        "METAR": _fetch_pool.submit(request_metar_data),
+        "HRRR": _fetch_pool.submit(request_cloud_data),
+    }
+
+    results, errors = {}, {}
+    for name, future in futures.items():
+        remaining = max(0.0, start + SOURCE_TIMEOUTS[name] - time.monotonic())
+        try:
+            results[name] = future.result(timeout=remaining)
+        except FutureTimeoutError:
+            errors[name] = f"no response within {SOURCE_TIMEOUTS[name]:.0f}s"
+        except Exception as e:
+            errors[name] = str(e)
+
+    taf_data = first_taf_report(results.get("TAF") or {})
+    if "TAF" not in errors and taf_data is None:
+        errors["TAF"] = "no TAF data found for CYYG"
+
+    metar_data = results.get("METAR", {})
+    cloud_data = results.get("HRRR", pd.DataFrame())
+    return taf_data, metar_data, cloud_data, errors
+
+def fetch_hrrr_points(points):
+    """Fetches the HRRR series of several named (lat, lon) grid points in parallel.
+
+    Returns (frames, errors) keyed by name; a failed point gets an empty DataFrame.
+    """
+    futures = {name: _fetch_pool.submit(request_cloud_data, lat, lon) for name, (lat, lon) in points.items()}
+    frames, errors = {}, {}
+    for name, future in futures.items():
+        try:
+            frames[name] = future.result(timeout=SOURCE_TIMEOUTS["HRRR"])
+        except FutureTimeoutError:
+            frames[name], errors[name] = pd.DataFrame(), f"no response within {SOURCE_TIMEOUTS['HRRR']:.0f}s"
+        except Exception as e:
+            frames[name], errors[name] = pd.DataFrame(), str(e)
+    return frames, errors
+
+def source_versions(taf_data, metar_data, cloud_data):
+    """Identifies the upstream issue behind each feed: METAR observation time, TAF issue time, HRRR run.
+
+    A feed that is unavailable is reported as None.
+    """
+    metar_time = (metar_data or {}).get('time', {}).get('dt') or (metar_data or {}).get('meta', {}).get('timestamp')
+    taf_issued = (taf_data or {}).get('timestamp', {}).get('issued')
+    hrrr_run = str(cloud_data['DATETIME'].iloc[0]) if 'DATETIME' in cloud_data.columns and not cloud_data.empty else None
+    return {"METAR": metar_time, "TAF": taf_issued, "HRRR": hrrr_run}
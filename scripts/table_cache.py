@@ -0,0 +1,87 @@
+import json
+import logging
+import os
+import threading
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Binary copies of the CSV tables; the CSVs stay the source of truth
+CACHE_DIR = os.path.join("csv", ".cache")
+
+def _csv_signature(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+def _cache_paths(csv_path, cache_dir):
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    base = os.path.join(cache_dir, name)
+    return f"{base}.index.npy", f"{base}.values.npy", f"{base}.meta.json"
+
+def _save_atomic(path, writer):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        writer(f)
+    os.replace(tmp_path, path)  # Readers keep their mapping of the old file
+
+def _build(csv_path, time_column, cache_dir):
+    """Parses the CSV once and writes its timestamps and numeric columns as .npy files."""
+    df = pd.read_csv(csv_path)
+    df[time_column] = pd.to_datetime(df[time_column])
+    columns = [c for c in df.columns if c != time_column]
+
+    index_path, values_path, meta_path = _cache_paths(csv_path, cache_dir)
+    index = df[time_column].to_numpy(dtype="datetime64[ns]")
+    values = np.ascontiguousarray(df[columns].to_numpy(dtype=np.float64))
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        _save_atomic(index_path, lambda f: np.save(f, index))
+        _save_atomic(values_path, lambda f: np.save(f, values))
+        # The metadata goes last: until it matches the CSV, readers rebuild
+        meta = {"source": _csv_signature(csv_path), "time_column": time_column, "columns": columns}
+        _save_atomic(meta_path, lambda f: f.write(json.dumps(meta).encode("utf-8")))
+    except OSError as e:
+        logger.warning(f"Could not write the binary cache for {csv_path} ({e}); using the parsed CSV.")
+    return index, values, columns
+
+def load_arrays(csv_path, time_column, cache_dir=CACHE_DIR):
+    """Returns (timestamps, float64 values, column names) of a timestamped numeric CSV.
+
+    The arrays are memory-mapped from the binary cache, which is rebuilt whenever the
+    CSV's mtime or size no longer matches the one it was built from.
+    """
+    index_path, values_path, meta_path = _cache_paths(csv_path, cache_dir)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta["source"] == _csv_signature(csv_path) and meta["time_column"] == time_column:
+            index = np.load(index_path, mmap_mode="r")
+            values = np.load(values_path, mmap_mode="r")
+            return index, values, meta["columns"]
+    except (OSError, ValueError, KeyError):
+        pass  # Missing or stale cache
+    return _build(csv_path, time_column, cache_dir)
+
+_frames = {}
+_frames_lock = threading.Lock()
+
+def load_frame(csv_path, time_column, cache_dir=CACHE_DIR):
+    """Returns the table as a DataFrame with typed timestamps, shared by every session.
+
+    The frame is rebuilt only when the CSV changes; callers must not modify it in place.
+    """
+    signature = _csv_signature(csv_path)
+    entry = _frames.get(csv_path)
+    if entry is not None and entry[0] == signature:
+        return entry[1]
+
+    with _frames_lock:
+        entry = _frames.get(csv_path)
+        if entry is None or entry[0] != signature:
+            index, values, columns = load_arrays(csv_path, time_column, cache_dir)
+            frame = pd.DataFrame(np.asarray(values), columns=columns)
+            frame.insert(0, time_column, pd.DatetimeIndex(np.asarray(index)))
+            entry = (signature, frame)
+            _frames[csv_path] = entry
+    return entry[1]
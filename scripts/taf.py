@@ -4,26 +4,20 @@ from datetime import datetime
 import pytz
 from dateutil import parser
 
-url2 = st.secrets["TAF_URL"]
-loc = st.secrets["LOC"]
-key = st.secrets["KEY"]
+from scripts.sources import first_taf_report, request_taf_data
 
 def fetch_taf_data():
     """Fetches TAF data from the CheckWX API."""
-    url = f"{url2}/{loc}/decoded"
-    headers = {"X-API-Key": key}
     try:
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            data = response.json()
-            if 'data' in data and data['data']:
-                return data['data'][0]
-            else:
-                st.error("No TAF data found for CYYG.")
-                return None
+        taf_data = first_taf_report(request_taf_data())
+        if taf_data is not None:
+            return taf_data
         else:
-            st.error(f"⚠ Failed to fetch TAF data. HTTP Status: {response.status_code}")
+            st.error("No TAF data found for CYYG.")
             return None
+    except requests.exceptions.HTTPError as e:
+        st.error(f"⚠ Failed to fetch TAF data. HTTP Status: {e.response.status_code}")
+        return None
     except Exception as e:
         st.error(f"⚠ Error fetching TAF data: {e}")
         return None
@@ -1,29 +1,27 @@
+import logging
 import requests
 import numpy as np
-import streamlit as st
 from datetime import datetime, timedelta
 import pytz
 import pandas as pd
-from scripts.taf import fetch_taf_data
-from scripts.cloud import fetch_cloud_data
+from scripts import metrics
+from scripts.sources import fetch_sources_concurrently, request_metar_data
+from scripts.solar_table import SOLAR_COLUMNS, get_solar_table
+from scripts.solar_geometry import clock_hours, solar_params
 
-solar_data = pd.read_csv('csv/solar_2025.csv')
-solar_data['timestamp'] = pd.to_datetime(solar_data['timestamp'])
+logger = logging.getLogger(__name__)
 
-base = st.secrets["BASE_URL"]
-location = st.secrets["LOCATION"]
-token = st.secrets["TOKEN"]
+# Sky cover code -> cloud coverage (%)
+CLOUD_COVER = {'SKC': 0.0, 'FEW': 17.5, 'SCT': 37.5, 'BKN': 67.5, 'OVC': 92.5, 'VV': 100.0}
 
 def fetch_weather_data():
-    url = f"{base}/{location}?token={token}&format=json"
+    """Fetches METAR JSON through the same cached request as the METAR page."""
     try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            st.error("⚠ Failed to fetch weather data.")
+        return request_metar_data()
+    except requests.exceptions.HTTPError:
+        logger.error("Failed to fetch weather data.")
     except Exception as e:
-        st.error(f"⚠ Error fetching data: {e}")
+        logger.error(f"Error fetching data: {e}")
     return {}
 
 def get_weather_value(weather_data, key, default=None):
@@ -36,12 +34,11 @@ def get_weather_value(weather_data, key, default=None):
     return default
 
 def get_cloud_coverage_metar(metar_data):
-    cloud_map = {'SKC': 0.0, 'FEW': 17.5, 'SCT': 37.5, 'BKN': 67.5, 'OVC': 92.5, 'VV': 100.0}
     cloud_layers = []
     if 'clouds' in metar_data and isinstance(metar_data['clouds'], list):
         for cloud in metar_data['clouds']:
             cloud_type = cloud.get('type', '')
-            cloud_layers.append(cloud_map.get(cloud_type, 0.0))
+            cloud_layers.append(CLOUD_COVER.get(cloud_type, 0.0))
     return (
         cloud_layers[0] if len(cloud_layers) > 0 else 0.0,
         cloud_layers[1] if len(cloud_layers) > 1 else 0.0,
@@ -49,46 +46,21 @@ def get_cloud_coverage_metar(metar_data):
     )
 
 def get_cloud_coverage_taf(forecast):
-    cloud_map = {'SKC': 0.0, 'FEW': 17.5, 'SCT': 37.5, 'BKN': 67.5, 'OVC': 92.5, 'VV': 100.0}
     cloud_layers = []
     if 'clouds' in forecast and isinstance(forecast['clouds'], list):
         for cloud in forecast['clouds']:
             cloud_type = cloud.get('code', '')
-            cloud_layers.append(cloud_map.get(cloud_type, 0.0))
+            cloud_layers.append(CLOUD_COVER.get(cloud_type, 0.0))
     return (
         cloud_layers[0] if len(cloud_layers) > 0 else 0.0,
         cloud_layers[1] if len(cloud_layers) > 1 else 0.0,
         cloud_layers[2] if len(cloud_layers) > 2 else 0.0
     )
 
-def get_solar_params(current_time):
-    match = solar_data[(solar_data['timestamp'].dt.date == current_time.date()) &
-                       (solar_data['timestamp'].dt.hour == current_time.hour)]
-    if not match.empty:
-        return (match['solar_elevationdegrees'].values[0],
-                match['solar_azimuthdegrees'].values[0],
-                match['solar_declinationdegrees'].values[0],
-                match['hour_angledegrees'].values[0],
-                match['tmaxGHI'].values[0])
-    else:
-        return 0.0, 0.0, 0.0, 0.0, 0.0
-
-def extract_weather_features_for_hours():
-    taf_data = fetch_taf_data()
-    metar_data = fetch_weather_data()
-    cloud_data = fetch_cloud_data()
-    cloud_data['DATETIME'] = pd.to_datetime(cloud_data['DATETIME'], errors='coerce').dt.tz_localize('UTC').dt.tz_convert('America/Halifax')
-
-    if taf_data is None and metar_data is None:
-        return []
-
-    features_list = []
-    current_time = datetime.now(pytz.timezone("America/Halifax"))
-
+def observed_features(metar_data):
+    """The weather features observed in a METAR report, with defaults for missing fields."""
     low_cloud, mid_cloud, high_cloud = get_cloud_coverage_metar(metar_data)
-    solar_elevation, solar_azimuth, solar_declination, hour_angle, tmaxGHI = get_solar_params(current_time)
-
-    base_features = {
+    return {
         'temperature_celsius': get_weather_value(metar_data, 'temperature', 0.0),
         'humidity_percent': round(get_weather_value(metar_data, 'relative_humidity', 0.0) * 100),
         'wind_speed_kmph': get_weather_value(metar_data, 'wind_speed', 5) * 1.852,
@@ -99,55 +71,156 @@ def extract_weather_features_for_hours():
         'low_cloud_coverage': low_cloud,
         'mid_cloud_coverage': mid_cloud,
         'high_cloud_coverage': high_cloud,
-        'solar_elevationdegrees': solar_elevation,
-        'solar_azimuthdegrees': solar_azimuth,
-        'solar_declinationdegrees': solar_declination,
-        'hour_angledegrees': hour_angle,
-        'timehr': current_time.hour,
-        'tmaxGHI': tmaxGHI
     }
-    features_list.append(base_features)
-
-    forecasts = taf_data.get('forecast', [])
-    unique_forecasts = list(forecasts[:3])
-
-    prev_features = base_features.copy()
-    for i, forecast in enumerate(unique_forecasts, start=1):
-        next_time = current_time + timedelta(hours=i)
-        next_time = next_time.astimezone(pytz.timezone('America/Halifax'))
-
-        low_cloud, mid_cloud, high_cloud = get_cloud_coverage_taf(forecast)
-        wind_speed = forecast.get('wind', {}).get('speed_kph', prev_features['wind_speed_kmph'])
-        wind_gust = forecast.get('wind', {}).get('gust_kph', prev_features['wind_gust_kmph'])
-        wind_direction = forecast.get('wind', {}).get('degrees', prev_features['wind_direction_degrees'])
-        visibility = forecast.get('visibility', {}).get('meters', prev_features['visibility_meters_float'])
-        altimeter = prev_features['altimeter_hpa']
-
-        closest_row = cloud_data.iloc[(cloud_data['DATETIME'] - next_time).abs().argsort()[:1]]
-        temp = closest_row['TMP'].values[0] if not closest_row.empty else prev_features['temperature_celsius']
-        humidity = closest_row['RH'].values[0] if not closest_row.empty else prev_features['humidity_percent']
-
-        solar_elevation, solar_azimuth, solar_declination, hour_angle, tmaxGHI = get_solar_params(next_time)
-
-        taf_features = {
-            'temperature_celsius': temp,
-            'humidity_percent': humidity,
-            'wind_speed_kmph': wind_speed,
-            'wind_gust_kmph': wind_gust,
-            'wind_direction_degrees': wind_direction,
-            'visibility_meters_float': visibility,
-            'altimeter_hpa': altimeter,
-            'low_cloud_coverage': low_cloud,
-            'mid_cloud_coverage': mid_cloud,
-            'high_cloud_coverage': high_cloud,
-            'solar_elevationdegrees': solar_elevation,
-            'solar_azimuthdegrees': solar_azimuth,
-            'solar_declinationdegrees': solar_declination,
-            'hour_angledegrees': hour_angle,
-            'timehr': next_time.hour,
-            'tmaxGHI': tmaxGHI
-        }
-        features_list.append(taf_features)
-        prev_features = taf_features
-
-    return features_list
+
+@metrics.timed("solar_lookup")
+def get_solar_params_batch(times):
+    """One row of solar parameters per timestamp, from the solar table or the analytic geometry outside it."""
+    times = pd.DatetimeIndex(times)
+    table = get_solar_table()
+    pos = table.positions(times)
+    hit = pos >= 0
+
+    params = np.empty((len(times), len(SOLAR_COLUMNS)))
+    params[hit] = table.values[pos[hit]]
+    if not hit.all():
+        params[~hit] = solar_params(clock_hours(times[~hit])).to_numpy()
+    return pd.DataFrame(params, columns=SOLAR_COLUMNS)
+
+def align_hrrr(cloud_data, times, columns, tolerance=None, interpolate=False):
+    """Aligns HRRR model steps to forecast times in one vectorized pass.
+
+    cloud_data must carry the sorted VALID_TIME column added by prepare_hrrr_frame.
+    By default each time takes the values of its nearest model step; with interpolate=True
+    values are linearly interpolated between the surrounding steps instead. Times further
+    than tolerance (a Timedelta) from any step, or outside the model run when
+    interpolating, get NaN.
+    """
+    times = pd.DatetimeIndex(times)
+    result = pd.DataFrame(np.nan, index=range(len(times)), columns=columns)
+    if 'VALID_TIME' not in cloud_data.columns or cloud_data.empty or not len(times):
+        return result
+
+    valid = cloud_data['VALID_TIME'].notna().to_numpy()
+    steps = pd.DatetimeIndex(cloud_data['VALID_TIME']).asi8[valid]  # UTC nanoseconds
+    query = times.asi8
+    if not len(steps):
+        return result
+
+    # Nearest step: compare the neighbours on either side of each insertion point
+    right = np.clip(np.searchsorted(steps, query), 0, len(steps) - 1)
+    left = np.clip(right - 1, 0, len(steps) - 1)
+    nearest = np.where(np.abs(steps[left] - query) <= np.abs(steps[right] - query), left, right)
+    in_range = np.ones(len(query), dtype=bool)
+    if tolerance is not None:
+        in_range = np.abs(steps[nearest] - query) <= pd.Timedelta(tolerance).value
+
+    for column in columns:
+        values = pd.to_numeric(cloud_data[column], errors='coerce').to_numpy(dtype=float)[valid]
+        if interpolate:
+            aligned = np.interp(query, steps, values, left=np.nan, right=np.nan)
+        else:
+            aligned = values[nearest]
+        result[column] = np.where(in_range, aligned, np.nan)
+    return result
+
+def _log_source_error(name, reason):
+    logger.warning(f"{name} data unavailable ({reason}); using fallback values.")
+
+# HRRR columns behind each model feature; SpotWX reports wind speed and gust in knots
+HRRR_FEATURES = {
+    'temperature_celsius': ('TMP', 1.0),
+    'humidity_percent': ('RH', 1.0),
+    'wind_speed_kmph': ('WSPD', 1.852),
+    'wind_gust_kmph': ('GUST', 1.852),
+    'wind_direction_degrees': ('WDIR', 1.0),
+    'low_cloud_coverage': ('LCDC', 1.0),
+    'mid_cloud_coverage': ('MCDC', 1.0),
+    'high_cloud_coverage': ('HCDC', 1.0),
+}
+
+def taf_groups_frame(taf_data):
+    """Flattens the TAF forecast groups into one row per group, sorted by start time.
+
+    valid_from/valid_to are UTC nanoseconds; fields a group does not report are NaN.
+    """
+    rows = []
+    for forecast in (taf_data or {}).get('forecast', []):
+        timestamp = forecast.get('timestamp', {})
+        if not timestamp.get('from') or not timestamp.get('to'):
+            continue
+        wind = forecast.get('wind', {})
+        clouds = get_cloud_coverage_taf(forecast) if forecast.get('clouds') else (np.nan,) * 3
+        rows.append({
+            'valid_from': pd.Timestamp(timestamp['from']).value,
+            'valid_to': pd.Timestamp(timestamp['to']).value,
+            'wind_speed_kmph': wind.get('speed_kph', np.nan),
+            'wind_gust_kmph': wind.get('gust_kph', np.nan),
+            'wind_direction_degrees': wind.get('degrees', np.nan),
+            'visibility_meters_float': forecast.get('visibility', {}).get('meters', np.nan),
+            'low_cloud_coverage': clouds[0],
+            'mid_cloud_coverage': clouds[1],
+            'high_cloud_coverage': clouds[2],
+        })
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).astype(float).sort_values('valid_from', kind='stable', ignore_index=True)
+
+def apply_taf_groups(frame, times, taf):
+    """Overwrites frame's features with the TAF group valid at each time, where it reports them.
+
+    taf comes from taf_groups_frame. Where groups overlap (BECMG/TEMPO within an FM group)
+    the latest-starting group covering the time wins, feature by feature: a field it does
+    not report comes from the next group that covers the time.
+    """
+    if taf.empty:
+        return frame
+    query = pd.DatetimeIndex(times).asi8
+    # groups x times; a TAF has only a handful of groups
+    covers = (taf['valid_from'].to_numpy()[:, None] <= query) & (query < taf['valid_to'].to_numpy()[:, None])
+    last = len(taf) - 1
+    for feature in taf.columns.drop(['valid_from', 'valid_to']):
+        values = taf[feature].to_numpy()
+        reported = covers & ~np.isnan(values)[:, None]
+        group = last - reported[::-1].argmax(axis=0)  # Latest-starting group reporting the feature
+        frame[feature] = np.where(reported.any(axis=0), values[group], frame[feature].to_numpy())
+    return frame
+
+@metrics.timed("features")
+def extract_weather_features_frame(horizon, on_source_error=_log_source_error, sources=None, current_time=None):
+    """Builds the model features for `horizon` hourly rows from now, driven by HRRR.
+
+    The current hour is the METAR observation. Later hours take temperature, humidity,
+    wind and cloud layers from the nearest HRRR step; within a TAF group's validity its
+    clouds, wind and visibility replace the HRRR values. Anything still missing carries
+    forward from the hour before. Returns an empty DataFrame when no feed is available.
+    """
+    taf_data, metar_data, cloud_data, errors = sources or fetch_sources_concurrently()
+    for name, reason in errors.items():
+        on_source_error(name, reason)
+
+    if not taf_data and not metar_data and cloud_data.empty:
+        return pd.DataFrame()
+
+    if current_time is None:
+        current_time = datetime.now(pytz.timezone("America/Halifax"))
+    times = pd.DatetimeIndex([current_time + timedelta(hours=i) for i in range(horizon)])
+    observed = observed_features(metar_data)
+
+    hrrr = align_hrrr(cloud_data, times, [column for column, _ in HRRR_FEATURES.values()])
+    frame = pd.DataFrame(np.nan, index=range(horizon), columns=list(observed))
+    for feature, (column, scale) in HRRR_FEATURES.items():
+        frame[feature] = hrrr[column].to_numpy() * scale
+
+    apply_taf_groups(frame, times, taf_groups_frame(taf_data))
+
+    # The current hour is observed; forecasts fall back to the hour before, then to the METAR defaults
+    if metar_data:
+        frame.iloc[0] = pd.Series(observed)
+    frame = frame.ffill().fillna(observed)
+
+    solar = get_solar_params_batch(times)
+    frame[SOLAR_COLUMNS[:-1]] = solar[SOLAR_COLUMNS[:-1]].to_numpy()
+    frame['timehr'] = times.hour
+    frame['tmaxGHI'] = solar['tmaxGHI'].to_numpy()
+    return frame
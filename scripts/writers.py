@@ -0,0 +1,49 @@
+import os
+import pandas as pd
+
+class ResultWriter:
+    """Appends result chunks to a CSV file, or to a Parquet file when the path ends in .parquet."""
+
+    def __init__(self, path):
+        self.path = path
+        self._parquet = path.endswith(".parquet")
+        self._writer = None
+        self._header = True
+        if self._parquet:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError as e:
+                raise ImportError("Parquet output needs pyarrow (pip install pyarrow).") from e
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def write(self, df):
+        if self._parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode="a", header=self._header, index=False)
+            self._header = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+def read_chunks(source, name, chunk_rows, columns=None, dtype=None):
+    """Yields DataFrame chunks of a CSV or Parquet file (path or file object) without loading it whole.
+
+    columns is a predicate on the column name; only matching columns are parsed.
+    """
+    if str(name).endswith(".parquet"):
+        import pyarrow.parquet as pq  # Optional dependency, only needed for Parquet files
+        parquet = pq.ParquetFile(source)
+        names = [c for c in parquet.schema_arrow.names if columns is None or columns(c)]
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=names):
+            chunk = batch.to_pandas()
+            yield chunk.astype({c: t for c, t in (dtype or {}).items() if c in chunk.columns})
+    else:
+        yield from pd.read_csv(source, usecols=columns, dtype=dtype, chunksize=chunk_rows)
@@ -0,0 +1,29 @@
+import json
+import os
+import pandas as pd
+import pytest
+from scripts.sources import first_taf_report, prepare_hrrr_frame
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(ROOT, "benchmarks", "fixtures")
+FIXTURE_TIME = pd.Timestamp("2025-06-21 09:00", tz="America/Halifax")
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    # The app reads model.pkl and csv/ relative to the repository root
+    monkeypatch.chdir(ROOT)
+
+@pytest.fixture
+def fixture_time():
+    """The time the recorded feeds were captured for."""
+    return FIXTURE_TIME
+
+@pytest.fixture
+def sources():
+    """The recorded feeds as a fetch_sources_concurrently() result, without any HTTP."""
+    with open(os.path.join(FIXTURE_DIR, "taf.json")) as f:
+        taf = first_taf_report(json.load(f))
+    with open(os.path.join(FIXTURE_DIR, "metar.json")) as f:
+        metar = json.load(f)
+    hrrr = prepare_hrrr_frame(pd.read_csv(os.path.join(FIXTURE_DIR, "hrrr.csv")))
+    return taf, metar, hrrr, {}
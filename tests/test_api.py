@@ -0,0 +1,58 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+import numpy as np
+import pandas as pd
+import pytest
+from scripts import api
+from scripts.api import MicroBatcher, PredictionHandler, PredictionServer
+
+def test_batcher_returns_each_caller_its_own_slice(monkeypatch):
+    batches = []
+    def score(model, expected_features, features_df):
+        batches.append(len(features_df))
+        return features_df["x"].to_numpy() * 10
+    monkeypatch.setattr(api, "load_model", lambda: (None, ["x"]))
+    monkeypatch.setattr(api, "predict_power_batch", score)
+
+    batcher = MicroBatcher(window=0.2)
+    requests = {i: pd.DataFrame({"x": np.arange(i, i + 1 + i % 3, dtype=float)}) for i in range(6)}
+    results = {}
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, batcher.submit(requests[i])))
+               for i in requests]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(batches) < len(requests)  # Coalesced
+    for i, frame in requests.items():
+        np.testing.assert_array_equal(results[i], frame["x"].to_numpy() * 10)
+
+@pytest.fixture
+def server():
+    server = PredictionServer(("127.0.0.1", 0), PredictionHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+def _error(request):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(request, timeout=5)
+    return error.value.code, json.loads(error.value.read())
+
+def test_forecast_failure_is_a_json_503(server, monkeypatch):
+    def fail():
+        raise ConnectionError("feeds down")
+    monkeypatch.setattr(api, "latest_forecast", fail)
+    status, body = _error(f"{server}/forecast")
+    assert status == 503 and "feeds down" in body["error"]
+
+def test_model_load_failure_is_a_json_500(server, monkeypatch):
+    def fail():
+        raise FileNotFoundError("model.pkl")
+    monkeypatch.setattr(api, "load_model", fail)
+    request = urllib.request.Request(f"{server}/predict", data=b'{"rows": [{}]}', method="POST")
+    status, body = _error(request)
+    assert status == 500 and "model.pkl" in body["error"]
@@ -0,0 +1,40 @@
+import threading
+import time
+import pytest
+from scripts.cache import TTLCache
+
+def _hung_leader(cache, key, release):
+    thread = threading.Thread(target=cache.get_or_fetch, args=(key, 60, lambda: release.wait() or "new"), daemon=True)
+    thread.start()
+    time.sleep(0.05)  # Let the leader register its in-flight fetch
+    return thread
+
+def test_follower_gives_up_on_a_hung_fetch():
+    cache, release = TTLCache(), threading.Event()
+    _hung_leader(cache, ("taf", (), ()), release)
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        cache.get_or_fetch(("taf", (), ()), 60, lambda: "unused", wait_timeout=0.1)
+    assert time.monotonic() - start < 1
+    release.set()
+
+def test_follower_falls_back_to_the_expired_value():
+    cache, release = TTLCache(), threading.Event()
+    key = ("metar", (), ())
+    cache.get_or_fetch(key, 0, lambda: "old")  # Cached, but expired at once
+    _hung_leader(cache, key, release)
+    assert cache.get_or_fetch(key, 60, lambda: "unused", wait_timeout=0.1) == "old"
+    release.set()
+
+def test_default_and_explicit_arguments_share_an_entry(monkeypatch):
+    from scripts import cache as cache_module
+    monkeypatch.setattr(cache_module, "source_cache", TTLCache())
+    calls = []
+
+    @cache_module.cached_source("hrrr", ttl=60)
+    def fetch(lat=46.4392, lon=-63.8413):
+        calls.append((lat, lon))
+        return len(calls)
+
+    assert fetch() == fetch(46.4392, -63.8413) == fetch(lon=-63.8413) == 1
+    assert fetch(46.3050, -63.1460) == 2
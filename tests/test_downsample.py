@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+from scripts.downsample import MultiResolution, lttb
+
+def _sequential_lttb(x, y, threshold):
+    """The textbook bucket-by-bucket LTTB."""
+    n = len(y)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected, previous = [0], 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[previous] - avg_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (avg_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected.append(previous)
+    return np.array(selected + [n - 1])
+
+def test_lttb_matches_the_sequential_algorithm():
+    rng = np.random.default_rng(0)
+    x = np.arange(2900, dtype=float) * 3600
+    for y in (rng.normal(size=len(x)), np.sin(x / 86400) * (x % 86400)):
+        np.testing.assert_array_equal(lttb(x, y, 1000), _sequential_lttb(x, y, 1000))
+
+def test_every_column_keeps_its_peaks():
+    hours = pd.date_range("2025-01-01", periods=2500, freq="h")
+    frame = pd.DataFrame({"timestamp": hours, "flat": np.zeros(len(hours)), "spiky": np.zeros(len(hours))})
+    frame.loc[1234, "spiky"] = 100.0
+    series, resolution = MultiResolution(frame).series(hours[0], hours[-1] + pd.Timedelta(hours=1), ["flat", "spiky"])
+    assert resolution == "hourly" and len(series) <= 1000
+    assert series["spiky"].max() == 100.0
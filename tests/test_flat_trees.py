@@ -0,0 +1,15 @@
+import numpy as np
+from scripts.flat_trees import FlatTrees, check_parity, probe_rows
+from scripts.model import load_model
+
+def test_flattened_trees_match_the_booster_with_missing_values():
+    model, _ = load_model()
+    flat = FlatTrees.from_booster(model)
+    X = probe_rows(flat)
+    # Rows with one missing feature each, plus a row with every feature missing
+    one_missing = np.repeat(X[:1], X.shape[1], axis=0)
+    one_missing[np.arange(X.shape[1]), np.arange(X.shape[1])] = np.nan
+    all_missing = np.full((1, X.shape[1]), np.nan, dtype=np.float32)
+    X = np.vstack([X, one_missing, all_missing])
+    assert np.isnan(X).any(axis=1).sum() > X.shape[1]
+    check_parity(flat, model, X)
@@ -0,0 +1,38 @@
+import pandas as pd
+from scripts.forecast import MAX_HORIZON, IncrementalForecast, build_features, run_forecast
+
+def test_longer_horizon_keeps_the_first_hours(sources, fixture_time):
+    short = build_features(4, sources=sources, current_time=fixture_time)
+    long = build_features(MAX_HORIZON, sources=sources, current_time=fixture_time)
+    assert len(short) == 4 and len(long) == MAX_HORIZON
+    pd.testing.assert_frame_equal(short, long.head(4))
+
+def test_forecast_rows_match_across_horizons(sources, fixture_time):
+    short = run_forecast(4, sources=sources, current_time=fixture_time)
+    long = run_forecast(MAX_HORIZON, sources=sources, current_time=fixture_time)
+    pd.testing.assert_frame_equal(short, long.head(4))
+
+def test_unchanged_sources_rescore_nothing(sources, fixture_time):
+    forecast = IncrementalForecast(horizon=6)
+    _, _, rescored = forecast.update(sources, fixture_time)
+    assert rescored == 6
+    df, diff, rescored = forecast.update(sources, fixture_time)
+    assert rescored == 0 and diff.empty and len(df) == 6
+
+def test_changed_metar_field_rescores_only_the_current_hour(sources, fixture_time):
+    forecast = IncrementalForecast(horizon=6)
+    forecast.update(sources, fixture_time)
+    taf, metar, hrrr, errors = sources
+    metar = {**metar, "temperature": {"value": metar["temperature"]["value"] + 5}}
+    _, diff, rescored = forecast.update((taf, metar, hrrr, errors), fixture_time)
+    assert rescored == 1
+    assert diff["Change"].tolist() == ["changed"]
+    assert diff["Hour"].iloc[0] == fixture_time.isoformat()
+    assert diff["Changed Features"].iloc[0] == ["temperature_celsius"]
+
+def test_new_inference_backend_rescores_everything(sources, monkeypatch, fixture_time):
+    forecast = IncrementalForecast(horizon=6)
+    forecast.update(sources, fixture_time)
+    monkeypatch.setenv("INFERENCE_BACKEND", "inplace")
+    _, _, rescored = forecast.update(sources, fixture_time)
+    assert rescored == 6
@@ -0,0 +1,37 @@
+import http.server
+import threading
+import time
+from scripts import http_client
+
+class _RateLimited(http.server.BaseHTTPRequestHandler):
+    """Answers 429 with a one-hour Retry-After, then 200."""
+    calls = 0
+
+    def do_GET(self):
+        type(self).calls += 1
+        if type(self).calls == 1:
+            self.send_response(429)
+            self.send_header("Retry-After", "3600")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+def test_retry_after_is_capped(monkeypatch):
+    monkeypatch.setattr(http_client, "MAX_RETRY_AFTER", 0.2)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _RateLimited)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        start = time.monotonic()
+        response = http_client.get(f"http://127.0.0.1:{server.server_address[1]}/")
+        assert response.status_code == 200
+        assert time.monotonic() - start < 5
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,36 @@
+import numpy as np
+from scripts.intervals import MIN_SAMPLES, RESIDUALS_CSV, ResidualQuantiles, get_residual_quantiles
+from scripts.table_cache import load_frame
+from scripts.weather import get_solar_params_batch
+
+def test_every_daytime_bin_of_the_real_residuals_has_enough_samples():
+    quantiles = get_residual_quantiles(RESIDUALS_CSV)
+    assert quantiles.counts[1:].min() >= MIN_SAMPLES
+    frame = load_frame(RESIDUALS_CSV, "Timestamp")
+    assert quantiles.counts.sum() == len(frame)
+
+def test_bands_are_calibrated_on_the_real_residuals():
+    quantiles = get_residual_quantiles(RESIDUALS_CSV)
+    frame = load_frame(RESIDUALS_CSV, "Timestamp")
+    tmaxghi = get_solar_params_batch(frame["Timestamp"])["tmaxGHI"].to_numpy()
+    bins = np.clip(np.searchsorted(quantiles.edges, tmaxghi, side="right") - 1, 0, None)
+    daytime = bins > 0
+    residuals, offsets = frame["Residuals"].to_numpy()[daytime], quantiles.offsets[bins[daytime]]
+    # 18 daytime residuals: the closest achievable to 80% inside P10-P90 and 10% above P90
+    assert ((residuals >= offsets[:, 0]) & (residuals <= offsets[:, 2])).mean() >= 0.75
+    assert (residuals > offsets[:, 2]).mean() <= 0.12
+
+def test_p50_keeps_the_model_bias():
+    quantiles = get_residual_quantiles(RESIDUALS_CSV)
+    predictions = np.array([0.0, 500.0, 2000.0, 6000.0])
+    bands = quantiles.intervals(predictions, np.array([0.0, 150.0, 450.0, 800.0]))
+    assert bands["P50 (kW)"].iloc[0] == 0.0
+    np.testing.assert_allclose(bands["P50 (kW)"].iloc[1:], predictions[1:] + quantiles.offsets[1, 1])
+    assert (bands["P10 (kW)"] <= bands["P50 (kW)"]).all() and (bands["P50 (kW)"] <= bands["P90 (kW)"]).all()
+
+def test_sparse_bins_are_merged_with_their_neighbours():
+    tmaxghi = np.array([0.0] * 5 + [100.0] * 12 + [400.0] * 3 + [700.0] * 11)
+    residuals = np.arange(len(tmaxghi), dtype=float)
+    quantiles = ResidualQuantiles.from_residuals(residuals, tmaxghi)
+    assert quantiles.edges.tolist() == [0.0, 1.0, 300.0]
+    assert quantiles.counts.tolist() == [5, 12, 14]
@@ -0,0 +1,23 @@
+import pytest
+from streamlit.runtime.scriptrunner_utils.exceptions import RerunException, StopException
+from scripts import metrics
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+@pytest.mark.parametrize("exception", [RerunException(None), StopException()])
+def test_streamlit_control_flow_is_not_a_failure(exception):
+    with pytest.raises(type(exception)):
+        with metrics.timed("page:test"):
+            raise exception
+    stage = metrics.snapshot()["stages"]["page:test"]
+    assert (stage["calls"], stage["failures"]) == (1, 0)
+
+def test_errors_are_failures():
+    with pytest.raises(ValueError):
+        with metrics.timed("page:test"):
+            raise ValueError("boom")
+    assert metrics.snapshot()["stages"]["page:test"]["failures"] == 1
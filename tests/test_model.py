@@ -0,0 +1,29 @@
+import os
+import shutil
+import pytest
+from scripts import model as model_module
+from scripts.forecast import build_features
+from scripts.model import MODEL_PATH, load_model, predict_power_batch
+
+def test_unknown_inference_backend_is_rejected(monkeypatch, sources, fixture_time):
+    monkeypatch.setenv("INFERENCE_BACKEND", "xgbost")
+    model, expected_features = load_model()
+    features_df = build_features(4, sources=sources, current_time=fixture_time)
+    with pytest.raises(ValueError, match="INFERENCE_BACKEND"):
+        predict_power_batch(model, expected_features, features_df)
+
+def test_replaced_model_file_is_reloaded(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_module, "_registry", {"signature": None, "model": None, "expected_features": None})
+    path = str(tmp_path / "model.pkl")
+    shutil.copy(MODEL_PATH, path)
+
+    first, features = load_model(path)
+    assert load_model(path)[0] is first  # Unchanged file: the cached booster
+
+    # Replace the file (atomically, as a deploy would) with a new mtime
+    shutil.copy(MODEL_PATH, f"{path}.new")
+    os.utime(f"{path}.new", ns=(2_000_000_000, 2_000_000_000))
+    os.replace(f"{path}.new", path)
+    second, second_features = load_model(path)
+    assert second is not first and second_features == features
+    assert load_model(path)[0] is second
@@ -0,0 +1,34 @@
+import pytest
+import requests
+from scripts import http_client, replay
+
+def _response(body):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body.encode("utf-8")
+    response.encoding = "utf-8"
+    response.headers["Content-Type"] = "application/json"
+    return response
+
+def test_replay_serves_the_recorded_body_for_its_time(tmp_path, monkeypatch):
+    directory = str(tmp_path)
+    replay.save_response("metar", _response('{"temperature": {"value": 16}}'), directory, "2025-06-21 12:00")
+    replay.save_response("metar", _response('{"temperature": {"value": 18}}'), directory, "2025-06-21 13:00")
+    monkeypatch.setenv("HTTP_MODE", "replay")
+    monkeypatch.setenv("HTTP_RECORDINGS", directory)
+
+    try:
+        replay.set_replay_time("2025-06-21 12:30")
+        response = http_client.get("https://example.invalid/metar", source="metar")
+        assert response.status_code == 200
+        assert response.text == '{"temperature": {"value": 16}}'
+        assert response.headers["Content-Type"] == "application/json"
+
+        replay.set_replay_time("2025-06-21 13:00")
+        assert http_client.get("https://example.invalid/metar", source="metar").json()["temperature"]["value"] == 18
+
+        replay.set_replay_time("2025-06-21 11:00")  # Before anything was recorded
+        with pytest.raises(requests.exceptions.ConnectionError):
+            http_client.get("https://example.invalid/metar", source="metar")
+    finally:
+        replay.set_replay_time(None)
@@ -0,0 +1,12 @@
+import time
+from scripts.scheduler import ForecastScheduler
+
+def test_catch_up_requests_are_rate_limited(tmp_path):
+    scheduler = ForecastScheduler(snapshot_dir=str(tmp_path))
+    scheduler.request_refresh()
+    assert scheduler._wake.is_set()
+
+    scheduler._wake.clear()
+    scheduler._last_attempt = time.monotonic()  # A refresh has just started
+    scheduler.request_refresh()
+    assert not scheduler._wake.is_set()
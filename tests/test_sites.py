@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+from scripts.forecast import run_forecast
+from scripts.sites import SITES, capacity_table, scale_to_sites, score_site
+
+def test_single_capacity_row_is_zero_before_it_takes_effect():
+    capacities = pd.DataFrame({"site": ["Crapaud"], "capacity_kw": [1000.0],
+                               "effective_from": [pd.Timestamp("2025-06-01")]})
+    timestamps = pd.to_datetime(["2025-05-31 12:00", "2025-06-01 12:00"])
+    scaled = scale_to_sites([12500.0, 12500.0], capacities, timestamps)
+    assert scaled["Predicted Power in Crapaud (kW)"].tolist() == [0.0, 1000.0]
+
+def test_capacity_changes_never_rescale_the_reference_prediction():
+    expansion = pd.DataFrame({"site": ["Slemon Park"], "capacity_kw": [15000.0],
+                              "effective_from": [pd.Timestamp("2026-01-01")]})
+    capacities = pd.concat([capacity_table(), expansion], ignore_index=True)
+    timestamps = pd.to_datetime(["2025-06-21 12:00", "2026-06-21 12:00"])
+    scaled = scale_to_sites([12500.0, 12500.0], capacities, timestamps)
+    assert scaled["Predicted Power in Slemon Park (kW)"].tolist() == [12500.0, 15000.0]
+    assert scaled["Predicted Power in Crapaud (kW)"].tolist() == [1000.0, 1000.0]
+
+def test_reference_site_matches_the_single_site_forecast(sources, fixture_time):
+    site = score_site("Slemon Park", SITES["Slemon Park"], sources, fixture_time, 4, {"forecast": {}})
+    forecast = run_forecast(4, sources=sources, current_time=fixture_time)
+    np.testing.assert_allclose(site["Predicted Power (kW)"], forecast["Predicted Power (kW)"])
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+from scripts.solar_geometry import generate_solar_table
+from scripts.solar_table import SOLAR_CSV
+
+# Parity with csv/solar_2025.csv. The geometry is exact up to rounding; tmaxGHI in the CSV
+# is empirical, so the analytic fit is held to its documented error instead.
+GEOMETRY_TOLERANCE = 0.05  # degrees
+GHI_RMSE_TOLERANCE = 55.0  # Wh/m²
+GHI_MAX_TOLERANCE = 330.0  # Wh/m²
+DAYLIGHT_MISMATCH_TOLERANCE = 210  # hours of 2025 where exactly one of the two is above 0
+
+def test_generated_2025_table_matches_the_csv():
+    csv = pd.read_csv(SOLAR_CSV)
+    generated = generate_solar_table(2025)
+    assert generated["timestamp"].tolist() == csv["timestamp"].tolist()
+
+    for column in ("solar_elevationdegrees", "solar_declinationdegrees", "hour_angledegrees"):
+        assert np.abs(generated[column] - csv[column]).max() <= GEOMETRY_TOLERANCE, column
+    azimuth = np.abs(generated["solar_azimuthdegrees"] - csv["solar_azimuthdegrees"]) % 360
+    assert np.minimum(azimuth, 360 - azimuth).max() <= GEOMETRY_TOLERANCE
+
+    error = generated["tmaxGHI"] - csv["tmaxGHI"]
+    assert np.sqrt((error ** 2).mean()) <= GHI_RMSE_TOLERANCE
+    assert error.abs().max() <= GHI_MAX_TOLERANCE
+    assert ((generated["tmaxGHI"] > 0) != (csv["tmaxGHI"] > 0)).sum() <= DAYLIGHT_MISMATCH_TOLERANCE
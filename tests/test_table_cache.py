@@ -0,0 +1,22 @@
+import os
+import numpy as np
+from scripts.table_cache import load_arrays, load_frame
+
+def _write(path, values, mtime):
+    with open(path, "w") as f:
+        f.write("timestamp,value\n")
+        f.writelines(f"2025-01-01 {hour:02d}:00,{value}\n" for hour, value in enumerate(values))
+    os.utime(path, ns=(mtime, mtime))
+
+def test_binary_cache_is_rebuilt_when_the_csv_changes(tmp_path):
+    csv_path, cache_dir = str(tmp_path / "table.csv"), str(tmp_path / "cache")
+    _write(csv_path, [1.0, 2.0], mtime=1_000_000_000)
+    assert load_frame(csv_path, "timestamp", cache_dir)["value"].tolist() == [1.0, 2.0]
+    _, values, _ = load_arrays(csv_path, "timestamp", cache_dir)
+    assert isinstance(values, np.memmap)  # Served from the binary cache
+
+    # Same size, new contents and mtime
+    _write(csv_path, [3.0, 4.0], mtime=2_000_000_000)
+    assert load_frame(csv_path, "timestamp", cache_dir)["value"].tolist() == [3.0, 4.0]
+    _, values, _ = load_arrays(csv_path, "timestamp", cache_dir)
+    assert isinstance(values, np.memmap) and values.tolist() == [[3.0], [4.0]]
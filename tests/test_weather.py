@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+from scripts.weather import apply_taf_groups, taf_groups_frame
+
+def _group(start, end, speed=None, gust=None):
+    wind = {}
+    if speed is not None:
+        wind["speed_kph"] = speed
+    if gust is not None:
+        wind["gust_kph"] = gust
+    return {"timestamp": {"from": start, "to": end}, "wind": wind}
+
+def test_base_group_applies_again_after_a_tempo_group_ends():
+    taf = taf_groups_frame({"forecast": [
+        _group("2025-06-21T12:00:00Z", "2025-06-22T12:00:00Z", speed=20, gust=30),
+        _group("2025-06-21T14:00:00Z", "2025-06-21T16:00:00Z", speed=50),
+    ]})
+    times = pd.DatetimeIndex(["2025-06-21 11:00", "2025-06-21 15:00", "2025-06-21 17:00"], tz="UTC")
+    frame = pd.DataFrame(np.nan, index=range(3), columns=taf.columns.drop(["valid_from", "valid_to"]))
+    frame["wind_speed_kmph"], frame["wind_gust_kmph"] = 5.0, 6.0
+    apply_taf_groups(frame, times, taf)
+    np.testing.assert_array_equal(frame["wind_speed_kmph"], [5.0, 50.0, 20.0])
+    # The TEMPO group reports no gust, so the FM group's still applies during it
+    np.testing.assert_array_equal(frame["wind_gust_kmph"], [6.0, 30.0, 30.0])